@@ -8,10 +8,12 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from fastapi import FastAPI
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, List, Optional
-from services.common.server import create_app, run
+from services.common.server import MicroBatcher, create_app, json_route, run
+from functools import lru_cache
 import math
+import numpy as np
 
 app = create_app("arbiter")
 
@@ -45,6 +47,8 @@ class Metrics(BaseModel):
 
 class UtilityWeights(BaseModel):
     """Weights for utility function"""
+    model_config = ConfigDict(frozen=True)
+    
     wT: float = 0.35  # Throughput weight
     wE: float = 0.15  # Energy efficiency weight
     wL: float = 0.30  # Latency weight (negative)
@@ -52,6 +56,62 @@ class UtilityWeights(BaseModel):
     wC: float = 0.05  # Cost weight (negative)
 
 
+@lru_cache(maxsize=128)
+def _signed_weights(wT: float, wE: float, wL: float, wR: float, wC: float) -> np.ndarray:
+    """Weight vector with the penalty signs pre-baked: [wT, wE, −wL, −wR, −wC]"""
+    w = np.array([wT, wE, -wL, -wR, -wC], dtype=np.float64)
+    w.flags.writeable = False
+    return w
+
+
+def _weights_vector(weights: UtilityWeights) -> np.ndarray:
+    """Cached signed weight vector for a weights model"""
+    return _signed_weights(weights.wT, weights.wE, weights.wL, weights.wR, weights.wC)
+
+
+def _metrics_vector(m: Metrics) -> np.ndarray:
+    """Metrics in utility order: [throughput, energy_eff, latency, risk, cost]"""
+    return np.array(
+        [m.throughput, m.energy_eff, m.latency, m.risk, m.cost],
+        dtype=np.float64
+    )
+
+
+def _utility(vec5: np.ndarray, w: np.ndarray) -> float:
+    """U = w₁·Throughput + w₂·EnergyEfficiency − w₃·Latency − w₄·Risk − w₅·Cost"""
+    return float(np.dot(vec5, w))
+
+
+_DEFAULT_WEIGHTS = UtilityWeights()
+_SIGNED_W = _weights_vector(_DEFAULT_WEIGHTS)
+
+# Mode responses indexed by (Θ ≥ θ_low) + 2·(Θ ≥ θ_high);
+# θ_high takes precedence, as in the formula below
+_WRAP = {"state": 1, "mode_name": "Λ‑Wrap (Compression)"}
+_MODES = (
+    {"state": -1, "mode_name": "Λ‑Unwrap (Expansion)"},
+    {"state": 0, "mode_name": "Λ‑Steady (Equilibrium)"},
+    _WRAP,
+    _WRAP,
+)
+
+
+class UtilityBreakdown(BaseModel):
+    """Utility with its per-term contributions"""
+    utility: float
+    throughput_contribution: float
+    energy_contribution: float
+    latency_penalty: float
+    risk_penalty: float
+    cost_penalty: float
+
+
+class UtilityReq(BaseModel):
+    """Request to calculate utility"""
+    metrics: Metrics
+    weights: Optional[UtilityWeights] = None
+
+
 class AllocateReq(BaseModel):
     """Request to allocate resources"""
     metrics: Metrics
@@ -68,7 +128,6 @@ class AllocateResp(BaseModel):
     utility: float
 
 
-@app.post("/decide_mode", response_model=DecideResp)
 def decide_mode(req: DecideReq):
     """
     Decide operational mode based on resilience (Θ)
@@ -78,15 +137,12 @@ def decide_mode(req: DecideReq):
     - θ_low ≤ Θ < θ_high → Steady mode (0) - maintain equilibrium
     - Θ < θ_low → Unwrap mode (-1) - expansion/stress testing
     """
-    if req.theta >= req.high:
-        return {"state": 1, "mode_name": "Λ‑Wrap (Compression)"}
-    elif req.theta >= req.low:
-        return {"state": 0, "mode_name": "Λ‑Steady (Equilibrium)"}
-    else:
-        return {"state": -1, "mode_name": "Λ‑Unwrap (Expansion)"}
+    return _MODES[(req.theta >= req.low) + 2 * (req.theta >= req.high)]
+
+
+json_route(app, "/decide_mode", DecideReq, decide_mode, DecideResp)
 
 
-@app.post("/utility", response_model=Dict[str, float])
 def calculate_utility(metrics: Metrics, weights: Optional[UtilityWeights] = None):
     """
     Calculate utility function:
@@ -97,29 +153,92 @@ def calculate_utility(metrics: Metrics, weights: Optional[UtilityWeights] = None
     - Error_rate ≤ Emax
     - MTTR ≤ Rmax
     """
-    if weights is None:
-        weights = UtilityWeights()
+    w = _SIGNED_W if weights is None else _weights_vector(weights)
+    vec = _metrics_vector(metrics)
+    
+    utility = _utility(vec, w)
+    t, e, l, r, c = (vec * w).tolist()
     
-    utility = (
-        weights.wT * metrics.throughput +
-        weights.wE * metrics.energy_eff -
-        weights.wL * metrics.latency -
-        weights.wR * metrics.risk -
-        weights.wC * metrics.cost
+    return UtilityBreakdown(
+        utility=utility,
+        throughput_contribution=t,
+        energy_contribution=e,
+        latency_penalty=-l,
+        risk_penalty=-r,
+        cost_penalty=-c
     )
+
+
+def utility(req: UtilityReq):
+    """Calculate utility for an embedded metrics/weights body (see calculate_utility)"""
+    return calculate_utility(req.metrics, req.weights)
+
+
+json_route(app, "/utility", UtilityReq, utility, UtilityBreakdown)
+
+
+# Allocation tiers, indexed by latency headroom:
+# 0 = low latency requirement (prefer local), 1 = moderate (balanced),
+# 2 = high latency tolerance (prefer cloud). Columns: local, cloud, edge.
+_SPLITS = np.array([
+    [0.7, 0.2, 0.1],
+    [0.4, 0.4, 0.2],
+    [0.2, 0.6, 0.2],
+])
+# P_eff / P per tier, with Overhead_sync = 0.05·(P_cloud + P_edge)
+_P_EFF_SCALE = _SPLITS.sum(axis=1) - 0.05 * _SPLITS[:, 1:].sum(axis=1)
+_PLACEMENTS = (
+    {"inference": "local", "training": "cloud", "personalization": "edge"},
+    {"inference": "local+cloud", "training": "cloud", "personalization": "edge"},
+    {"inference": "cloud", "training": "cloud", "personalization": "edge"},
+)
+
+
+def _allocate_batch(reqs: List[AllocateReq]) -> List[AllocateResp]:
+    """
+    Allocate resources for a batch of requests in one vectorized pass
     
-    return {
-        "utility": utility,
-        "throughput_contribution": weights.wT * metrics.throughput,
-        "energy_contribution": weights.wE * metrics.energy_eff,
-        "latency_penalty": weights.wL * metrics.latency,
-        "risk_penalty": weights.wR * metrics.risk,
-        "cost_penalty": weights.wC * metrics.cost
-    }
+    Metrics and signed weights are stacked into (B, 5) arrays and the
+    utility of every request is a single row-wise dot product.
+    """
+    B = len(reqs)
+    X = np.empty((B, 5))
+    W = np.empty((B, 5))
+    P = np.empty(B)
+    L_max = np.empty(B)
+    for i, req in enumerate(reqs):
+        m = req.metrics
+        X[i] = (m.throughput, m.energy_eff, m.latency, m.risk, m.cost)
+        W[i] = _SIGNED_W if req.weights is None else _weights_vector(req.weights)
+        P[i] = m.P
+        L_max[i] = req.constraints.get("latency_max", 100.0)
+    
+    # Simple heuristic allocation based on latency requirements
+    latency = X[:, 2]
+    tier = np.where(latency < L_max * 0.5, 0, np.where(latency < L_max, 1, 2))
+    shares = (_SPLITS[tier] * P[:, None]).tolist()
+    
+    # Calculate utility with allocation
+    X[:, 0] *= _P_EFF_SCALE[tier]
+    utility = np.einsum("ij,ij->i", X, W).tolist()
+    
+    return [
+        AllocateResp(
+            P_local=local,
+            P_cloud=cloud,
+            P_edge=edge,
+            placement=_PLACEMENTS[t],
+            utility=u
+        )
+        for (local, cloud, edge), t, u in zip(shares, tier.tolist(), utility)
+    ]
+
+
+_allocate_batcher = MicroBatcher(_allocate_batch)
 
 
 @app.post("/allocate", response_model=AllocateResp)
-def allocate_resources(req: AllocateReq):
+async def allocate_resources(req: AllocateReq):
     """
     Allocate resources across local, cloud, and edge
     
@@ -131,78 +250,28 @@ def allocate_resources(req: AllocateReq):
     - Low-latency critical → local
     - Heavy training → cloud
     - Personalization/private → edge with distillation
-    """
-    weights = req.weights or UtilityWeights()
-    m = req.metrics
-    
-    # Simple heuristic allocation based on latency requirements
-    latency_threshold = req.constraints.get("latency_max", 100.0)
-    
-    if m.latency < latency_threshold * 0.5:
-        # Low latency requirement - prefer local
-        P_local = m.P * 0.7
-        P_cloud = m.P * 0.2
-        P_edge = m.P * 0.1
-        placement = {
-            "inference": "local",
-            "training": "cloud",
-            "personalization": "edge"
-        }
-    elif m.latency < latency_threshold:
-        # Moderate latency - balanced
-        P_local = m.P * 0.4
-        P_cloud = m.P * 0.4
-        P_edge = m.P * 0.2
-        placement = {
-            "inference": "local+cloud",
-            "training": "cloud",
-            "personalization": "edge"
-        }
-    else:
-        # High latency tolerance - prefer cloud
-        P_local = m.P * 0.2
-        P_cloud = m.P * 0.6
-        P_edge = m.P * 0.2
-        placement = {
-            "inference": "cloud",
-            "training": "cloud",
-            "personalization": "edge"
-        }
-    
-    # Calculate utility with allocation
-    overhead_sync = 0.05 * (P_cloud + P_edge)
-    P_effective = P_local + P_cloud + P_edge - overhead_sync
     
-    utility = (
-        weights.wT * m.throughput * (P_effective / m.P) +
-        weights.wE * m.energy_eff -
-        weights.wL * m.latency -
-        weights.wR * m.risk -
-        weights.wC * m.cost
-    )
-    
-    return AllocateResp(
-        P_local=P_local,
-        P_cloud=P_cloud,
-        P_edge=P_edge,
-        placement=placement,
-        utility=utility
-    )
+    Concurrent requests are coalesced into vectorized batches.
+    """
+    return await _allocate_batcher.submit(req)
+
+
+_STATUS = {
+    "service": "Λ‑Arbiter Core",
+    "description": "Meta-decisional cortex for Λ‑Möbius Pentastrat",
+    "capabilities": [
+        "Mode decision (Wrap/Steady/Unwrap)",
+        "Utility calculation",
+        "Resource allocation (local/cloud/edge)",
+        "Policy enforcement"
+    ]
+}
 
 
 @app.get("/status")
 def get_status():
     """Get Arbiter status"""
-    return {
-        "service": "Λ‑Arbiter Core",
-        "description": "Meta-decisional cortex for Λ‑Möbius Pentastrat",
-        "capabilities": [
-            "Mode decision (Wrap/Steady/Unwrap)",
-            "Utility calculation",
-            "Resource allocation (local/cloud/edge)",
-            "Policy enforcement"
-        ]
-    }
+    return _STATUS
 
 
 if __name__ == "__main__":
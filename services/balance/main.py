@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import Optional
-from services.common.server import create_app, run
+from services.common.server import create_app, json_route, pack_ns, run, short_id, utc_isoformat
+import time
 
 app = create_app("balance")
 
@@ -20,6 +21,8 @@ class PIDParams(BaseModel):
     kp: float = 0.2  # Proportional gain
     ki: float = 0.05  # Integral gain
     kd: float = 0.0  # Derivative gain
+    kaw: float = 0.1  # Anti-windup (back-calculation) gain
+    dt: float = 1.0  # Control interval
 
 
 class TuneReq(BaseModel):
@@ -52,36 +55,42 @@ class CheckpointResp(BaseModel):
     timestamp: str
 
 
-@app.post("/tune", response_model=TuneResp)
 def tune(req: TuneReq):
     """
     PID control for SLA maintenance
     
     Formula:
     error = Lmax - lat_p99
-    integral = integral + error (with anti-windup)
     derivative = error - prev_error
-    control = kp·error + ki·integral + kd·derivative
+    control = kp·error + ki·(integral + error·dt) + kd·derivative
+    throttle = sat(0.5 + control/100)
+    integral = integral + (error + kaw·(throttle − (0.5 + control/100))·100)·dt
+    
+    Back-calculation anti-windup: while the throttle is saturated the
+    integral is drained in proportion to the saturation excess, so the
+    controller recovers as soon as the error changes sign.
     
     Target: ρ* < 0.7–0.8 (utilization)
     """
+    pid = req.pid
+    
     # Calculate error
     error = req.Lmax - req.lat_p99
     
-    # Update integral with anti-windup
-    integ = req.integral + error
-    integ = max(min(integ, 1000.0), -1000.0)  # Clamp
-    
     # Calculate derivative
     deriv = error - req.prev_error
     
     # PID control signal
-    control = req.pid.kp * error + req.pid.ki * integ + req.pid.kd * deriv
+    control = pid.kp * error + pid.ki * (req.integral + error * pid.dt) + pid.kd * deriv
     
     # Convert to throttle [0, 1]
     # Positive control → less throttling (system is under target)
     # Negative control → more throttling (system is over target)
-    throttle = max(0.0, min(1.0, 0.5 + control / 100.0))
+    throttle_pre_sat = 0.5 + control / 100.0
+    throttle = max(0.0, min(1.0, throttle_pre_sat))
+    
+    # Update integral with back-calculation anti-windup
+    integ = req.integral + (error + pid.kaw * (throttle - throttle_pre_sat) * 100.0) * pid.dt
     
     # Priority adjustment
     priority = 1 if error < 0 else 0  # High priority if over limit
@@ -95,6 +104,9 @@ def tune(req: TuneReq):
     )
 
 
+json_route(app, "/tune", TuneReq, tune, TuneResp)
+
+
 @app.post("/checkpoint", response_model=CheckpointResp)
 def checkpoint(req: CheckpointReq):
     """
@@ -105,36 +117,35 @@ def checkpoint(req: CheckpointReq):
     - State recovery
     - A/B testing reversion
     """
-    import datetime
-    import hashlib
-    
     # Generate checkpoint ID
-    timestamp = datetime.datetime.utcnow().isoformat()
-    data = f"{req.component}:{timestamp}".encode()
-    checkpoint_id = f"ckpt-{hashlib.md5(data).hexdigest()[:12]}"
+    ns = time.time_ns()
+    checkpoint_id = short_id("ckpt", req.component.encode() + pack_ns(ns))
     
     # In production, save state to persistent storage
     # For now, return checkpoint ID
     return CheckpointResp(
         checkpoint_id=checkpoint_id,
-        timestamp=timestamp
+        timestamp=utc_isoformat(ns)
     )
 
 
+_STATUS = {
+    "service": "Λ‑Balance",
+    "description": "Homeostasis and SLA maintenance engine",
+    "capabilities": [
+        "PID/MPC control for SLA",
+        "Throttling management",
+        "Intelligent checkpointing",
+        "Oscillation prevention"
+    ],
+    "target_utilization": "ρ* < 0.7–0.8"
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Balance status"""
-    return {
-        "service": "Λ‑Balance",
-        "description": "Homeostasis and SLA maintenance engine",
-        "capabilities": [
-            "PID/MPC control for SLA",
-            "Throttling management",
-            "Intelligent checkpointing",
-            "Oscillation prevention"
-        ],
-        "target_utilization": "ρ* < 0.7–0.8"
-    }
+    return _STATUS
 
 
 if __name__ == "__main__":
@@ -1,4 +1,26 @@
 """Common utilities for Λ‑Möbius services"""
-from .server import create_app, run
+from .server import (
+    MicroBatcher,
+    RandomPool,
+    bounded_set,
+    bump_status_version,
+    create_app,
+    json_route,
+    pack_ns,
+    run,
+    short_id,
+    utc_isoformat,
+)
 
-__all__ = ["create_app", "run"]
+__all__ = [
+    "MicroBatcher",
+    "RandomPool",
+    "bounded_set",
+    "bump_status_version",
+    "create_app",
+    "json_route",
+    "pack_ns",
+    "run",
+    "short_id",
+    "utc_isoformat",
+]
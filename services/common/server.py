@@ -1,30 +1,59 @@
 """
 Common server utilities for Λ‑Möbius services
 """
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Any, Callable, Hashable, List, Optional
+from collections import OrderedDict
+import asyncio
+import datetime
+import importlib.util
+import inspect
+import itertools
+import os
+import struct
+import sys
 import uvicorn
 import logging
+import numpy as np
+import xxhash
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+pack_ns = struct.Struct("<Q").pack
 
-def create_app(name: str) -> FastAPI:
+
+def create_app(name: str, **kwargs: Any) -> FastAPI:
     """
     Create a FastAPI application with common configuration
     
+    Responses are serialized with orjson (ORJSONResponse) unless
+    default_response_class is overridden.
+    
     Args:
         name: Service name
+        **kwargs: Extra FastAPI arguments; these override the defaults
         
     Returns:
         Configured FastAPI application
     """
-    app = FastAPI(
-        title=f"Λ‑{name.capitalize()}",
-        description=f"Part of Λ‑Möbius Pentastrat AI‑OS",
-        version="1.0.0"
-    )
+    options = {
+        "title": f"Λ‑{name.capitalize()}",
+        "description": f"Part of Λ‑Möbius Pentastrat AI‑OS",
+        "version": "1.0.0",
+        "default_response_class": ORJSONResponse,
+    }
+    options.update(kwargs)
+    app = FastAPI(**options)
+    app.state.status_version = 0
+    app.state.status_cache = None
+    app.add_middleware(StatusETagMiddleware, state=app.state)
 
     @app.get("/health")
     def health():
@@ -34,13 +63,346 @@ def create_app(name: str) -> FastAPI:
     return app
 
 
-def run(app: FastAPI, port: int = 8000):
+def bump_status_version(app: FastAPI) -> None:
+    """
+    Invalidate the cached /status payload
+    
+    Call after any change that affects what /status reports.
+    
+    Args:
+        app: FastAPI application instance
+    """
+    app.state.status_version += 1
+
+
+class StatusETagMiddleware:
+    """
+    Serve GET /status with a weak ETag and answer If-None-Match with 304
+    
+    The rendered body is cached per status version (see
+    bump_status_version), so repeated scrapes skip both the handler and
+    JSON encoding. All other requests pass straight through.
+    """
+
+    def __init__(self, app, state):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] != "/status":
+            await self.app(scope, receive, send)
+            return
+
+        state = self.state
+        cached = state.status_cache
+        if cached is None or cached[0] != state.status_version:
+            version = state.status_version
+            start = {}
+            chunks = []
+
+            async def capture(message):
+                if message["type"] == "http.response.start":
+                    start.update(message)
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, receive, capture)
+            body = b"".join(chunks)
+            if start.get("status") != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            headers = {"ETag": f'W/"{xxhash.xxh3_64_hexdigest(body)}"'}
+            content_type = Headers(raw=start.get("headers", [])).get("content-type")
+            if content_type:
+                headers["Content-Type"] = content_type
+            cached = state.status_cache = (version, headers, body)
+
+        _, headers, body = cached
+        etag = headers["ETag"]
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        if etag in (t.strip() for t in if_none_match.split(",")) or if_none_match.strip() == "*":
+            response = Response(status_code=304, headers={"ETag": etag})
+        else:
+            response = Response(body, headers=headers)
+        await response(scope, receive, send)
+
+
+def short_id(prefix: str, data: bytes) -> str:
+    """
+    Generate a short opaque identifier
+    
+    Uses non-cryptographic XXH3 (IDs are labels, not integrity checks).
+    
+    Args:
+        prefix: ID prefix (e.g. "ckpt")
+        data: Bytes identifying the object
+        
+    Returns:
+        ID of the form "<prefix>-<12 hex chars>"
+    """
+    return f"{prefix}-{xxhash.xxh3_64_hexdigest(data)[:12]}"
+
+
+def utc_isoformat(ns: int) -> str:
+    """
+    Format a time.time_ns() timestamp as naive UTC ISO 8601
+    
+    Same format as datetime.datetime.utcnow().isoformat(), computed with
+    integer arithmetic so the value round-trips exactly.
+    
+    Args:
+        ns: Nanoseconds since the Unix epoch
+        
+    Returns:
+        ISO 8601 timestamp string
+    """
+    return (_EPOCH + datetime.timedelta(microseconds=ns // 1000)).isoformat()
+
+
+def bounded_set(d: OrderedDict, key: Hashable, value: Any, cap: int) -> None:
+    """
+    Insert into an OrderedDict used as a bounded LRU store
+    
+    The key becomes most-recent; the least-recent entry is evicted once
+    the store exceeds cap.
+    
+    Args:
+        d: Store to update
+        key: Entry key
+        value: Entry value
+        cap: Maximum number of entries kept
+    """
+    d[key] = value
+    d.move_to_end(key)
+    if len(d) > cap:
+        d.popitem(last=False)
+
+
+class RandomPool:
+    """
+    Pool of pre-generated uniform samples for simulated noise
+    
+    Samples are drawn in bulk from NumPy's PCG64 and handed out by a
+    monotonic counter; the pool is redrawn each time the counter wraps.
+    Not suitable for anything security-sensitive.
+    """
+
+    def __init__(self, size_log2: int = 16, seed: Optional[int] = None):
+        """
+        Args:
+            size_log2: Pool holds 2**size_log2 samples
+            seed: Optional seed for reproducibility
+        """
+        self._rng = np.random.default_rng(seed)
+        self._mask = (1 << size_log2) - 1
+        self._counter = itertools.count()
+        self._pool = self._rng.random(self._mask + 1).tolist()
+
+    def random(self) -> float:
+        """Uniform sample in [0, 1)"""
+        i = next(self._counter) & self._mask
+        if i == 0:
+            self._pool = self._rng.random(self._mask + 1).tolist()
+        return self._pool[i]
+
+    def uniform(self, lo: float, hi: float) -> float:
+        """Uniform sample in [lo, hi)"""
+        return lo + (hi - lo) * self.random()
+
+    def randint(self, lo: int, hi: int) -> int:
+        """Uniform integer in [lo, hi], inclusive"""
+        return lo + int(self.random() * (hi - lo + 1))
+
+    def coin(self) -> bool:
+        """Fair coin flip"""
+        return self.random() < 0.5
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent requests into vectorized batches
+    
+    The first queued item opens a short window; everything arriving
+    within it (up to max_batch) is handed to batch_fn as one list, and
+    each caller receives its own element of the returned list.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch: int = 64,
+        window_s: float = 0.005
+    ):
+        """
+        Args:
+            batch_fn: Function mapping a list of items to a list of results
+            max_batch: Maximum items per batch
+            window_s: Time to wait for more items after the first one
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.window_s = window_s
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        fut = loop.create_future()
+        self._queue.put_nowait((item, fut))
+        return await fut
+
+    async def _run(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.window_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+
+class _JSONRoute(APIRoute):
+    """
+    APIRoute documented from its declared body, served by a raw handler
+    
+    FastAPI builds the OpenAPI operation (request body, response model,
+    422) from endpoint as usual, but requests go straight to
+    fast_endpoint, skipping dependency solving and response validation.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        endpoint: Callable[..., Any],
+        *,
+        fast_endpoint: Callable[[Request], Any],
+        **kwargs: Any
+    ):
+        self.fast_endpoint = fast_endpoint
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        return self.fast_endpoint
+
+
+_ANY_ADAPTER = TypeAdapter(Any)
+
+
+def json_route(
+    app: FastAPI,
+    path: str,
+    req_type: Any,
+    handler: Callable[[Any], Any],
+    resp_type: Optional[Any] = None
+) -> Callable[[Any], Any]:
+    """
+    Register a lightweight JSON POST route for hot arithmetic endpoints
+    
+    The raw body is parsed and validated in a single pass by pydantic-core
+    (no intermediate dict, no dependency injection) and the result is
+    serialized straight to bytes. The handler runs inline on the event
+    loop, so it must be cheap and non-blocking.
+    
+    The route is still documented in the OpenAPI schema, and invalid
+    bodies get FastAPI's usual 422 response (error locations under
+    "body").
+    
+    Args:
+        app: FastAPI application instance
+        path: Route path
+        req_type: Request model (or any type pydantic can validate)
+        handler: Function taking the validated request
+        resp_type: Response model, documented in the OpenAPI schema
+        
+    Returns:
+        The unmodified handler, so it stays directly callable
+    """
+    req_adapter = TypeAdapter(req_type)
+
+    async def endpoint(request: Request) -> Response:
+        body = await request.body()
+        try:
+            req = req_adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+                body=body
+            )
+        return Response(
+            _ANY_ADAPTER.dump_json(handler(req)),
+            media_type="application/json"
+        )
+
+    # Signature-only stand-in from which FastAPI derives the body schema
+    def documented(req): ...
+    documented.__signature__ = inspect.Signature([
+        inspect.Parameter("req", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=req_type)
+    ])
+
+    app.router.routes.append(_JSONRoute(
+        path,
+        documented,
+        fast_endpoint=endpoint,
+        methods=["POST"],
+        response_model=resp_type,
+        name=handler.__name__,
+        description=inspect.getdoc(handler) or "",
+    ))
+    return handler
+
+
+def run(app: FastAPI, port: int = 8000, workers: Optional[int] = None):
     """
     Run the FastAPI application
     
+    Uses uvloop and httptools when installed. With more than one worker,
+    each process holds its own copy of the service's in-memory state.
+    
     Args:
         app: FastAPI application instance
         port: Port to listen on
+        workers: Worker processes (default: WORKERS env var, else 1)
     """
-    logger.info(f"Starting service on port {port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if workers is None:
+        workers = int(os.environ.get("WORKERS", "1"))
+    
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
+    target = app
+    if workers > 1:
+        # Worker processes re-import the app, which needs an import string
+        spec = getattr(sys.modules["__main__"], "__spec__", None)
+        if spec is None:
+            logger.warning("WORKERS > 1 requires `python -m services.<name>.main`; using 1 worker")
+            workers = 1
+        else:
+            target = f"{spec.name}:app"
+    
+    logger.info(f"Starting service on port {port} (workers={workers}, loop={loop}, http={http})")
+    uvicorn.run(target, host="0.0.0.0", port=port, loop=loop, http=http, workers=workers)
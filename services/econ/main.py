@@ -9,8 +9,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from fastapi import FastAPI
 from pydantic import BaseModel
-from typing import Dict, List
-from services.common.server import create_app, run
+from typing import Dict, List, Tuple
+from services.common.server import bump_status_version, create_app, json_route, run
+from collections import OrderedDict
+from operator import itemgetter
+import numpy as np
 
 app = create_app("econ")
 
@@ -34,7 +37,7 @@ class ROIResp(BaseModel):
 class InvestReq(BaseModel):
     """Request to allocate investment budget"""
     total_budget: float
-    candidates: List[Dict[str, float]]  # List of {id, ask, expected_roi}
+    candidates: List[Tuple[str, float, float]]  # List of (id, ask, expected_roi)
 
 
 class InvestResp(BaseModel):
@@ -57,15 +60,18 @@ class BudgetResp(BaseModel):
     remaining: float
 
 
-# Budget tracking
-BUDGETS = {
-    "entropy": {"allocated": 0.05, "spent": 0.0},
-    "regen": {"allocated": 0.10, "spent": 0.0},
-    "optimize": {"allocated": 0.15, "spent": 0.0},
-}
+# Budget tracking, in least-recently-spent order. /spend accepts any
+# component name, so spend-only entries (no allocation) are capped at
+# MAX_BUDGETS; components with an allocation are never evicted.
+MAX_BUDGETS = 4096
+BUDGETS: OrderedDict = OrderedDict([
+    ("entropy", {"allocated": 0.05, "spent": 0.0}),
+    ("regen", {"allocated": 0.10, "spent": 0.0}),
+    ("optimize", {"allocated": 0.15, "spent": 0.0}),
+])
+EVICTED_SPENT = 0.0  # Spend of evicted entries, kept in /status totals
 
 
-@app.post("/roi", response_model=ROIResp)
 def calculate_roi(req: ROIReq):
     """
     Calculate Return on Investment
@@ -103,6 +109,33 @@ def calculate_roi(req: ROIReq):
     )
 
 
+json_route(app, "/roi", ROIReq, calculate_roi, ROIResp)
+
+
+def _greedy_allocate(ask: np.ndarray, roi: np.ndarray, budget: float):
+    """
+    Greedy budget fill over SoA candidate columns
+    
+    Equivalent to walking candidates by descending ROI (stable for ties),
+    giving each min(ask, remaining) and stopping once remaining <= 0.
+    
+    Returns:
+        (order, alloc): candidate indices visited and their allocations
+    """
+    order = np.argsort(-roi, kind="stable")
+    # Subtract sequentially: a prefix sum rounds differently and can leave
+    # a phantom remainder (or shortfall) after the budget is spent exactly
+    alloc = []
+    remaining = budget
+    for i in order.tolist():
+        if remaining <= 0:
+            break
+        allocation = min(float(ask[i]), remaining)
+        alloc.append(allocation)
+        remaining -= allocation
+    return order[:len(alloc)], np.array(alloc, dtype=np.float64)
+
+
 @app.post("/invest", response_model=InvestResp)
 def allocate_investment(req: InvestReq):
     """
@@ -116,37 +149,21 @@ def allocate_investment(req: InvestReq):
     This is a greedy bandit approach:
     argmax_a E[ROI(a)] subject to budget constraint
     """
-    # Sort candidates by expected ROI
-    sorted_candidates = sorted(
-        req.candidates,
-        key=lambda c: c.get("expected_roi", 0.0),
-        reverse=True
-    )
+    cand = req.candidates
+    n = len(cand)
+    ask = np.fromiter(map(itemgetter(1), cand), dtype=np.float64, count=n)
+    roi = np.fromiter(map(itemgetter(2), cand), dtype=np.float64, count=n)
     
-    allocations = {}
-    remaining_budget = req.total_budget
-    expected_return = 0.0
+    order, alloc = _greedy_allocate(ask, roi, req.total_budget)
     
-    for candidate in sorted_candidates:
-        if remaining_budget <= 0:
-            break
-        
-        cid = candidate.get("id", "unknown")
-        ask = candidate.get("ask", 0.0)
-        expected_roi = candidate.get("expected_roi", 0.0)
-        
-        # Allocate up to what's requested or what's available
-        allocation = min(ask, remaining_budget)
-        allocations[cid] = allocation
-        remaining_budget -= allocation
-        expected_return += allocation * expected_roi
-    
-    total_allocated = req.total_budget - remaining_budget
+    allocations = {}
+    for i, allocation in zip(order.tolist(), alloc.tolist()):
+        allocations[cand[i][0]] = allocation
     
     return InvestResp(
         allocations=allocations,
-        total_allocated=total_allocated,
-        expected_return=expected_return
+        total_allocated=float(alloc.sum()),
+        expected_return=float(np.dot(alloc, roi[order]))
     )
 
 
@@ -172,33 +189,51 @@ def get_budget(req: BudgetReq):
 @app.post("/spend")
 def record_spend(component: str, amount: float):
     """Record spending for a component"""
-    if component not in BUDGETS:
-        BUDGETS[component] = {"allocated": 0.0, "spent": 0.0}
+    global EVICTED_SPENT
+    
+    budget = BUDGETS.get(component)
+    if budget is None:
+        if len(BUDGETS) >= MAX_BUDGETS:
+            # Evict the least-recently-spent component without an allocation
+            for key, old in BUDGETS.items():
+                if not old["allocated"]:
+                    EVICTED_SPENT += old["spent"]
+                    del BUDGETS[key]
+                    break
+        budget = BUDGETS[component] = {"allocated": 0.0, "spent": 0.0}
+    else:
+        BUDGETS.move_to_end(component)
     
-    BUDGETS[component]["spent"] += amount
+    budget["spent"] += amount
+    bump_status_version(app)
     
     return {
         "component": component,
         "spent": amount,
-        "total_spent": BUDGETS[component]["spent"]
+        "total_spent": budget["spent"]
     }
 
 
+_STATUS = {
+    "service": "Λ‑Econ",
+    "description": "Resource & Value Engine for ROI-driven reinvestment",
+    "capabilities": [
+        "ROI calculation",
+        "Budget allocation (greedy bandit)",
+        "Spend tracking",
+        "Investment optimization"
+    ]
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Econ status"""
     total_allocated = sum(b["allocated"] for b in BUDGETS.values())
-    total_spent = sum(b["spent"] for b in BUDGETS.values())
+    total_spent = EVICTED_SPENT + sum(b["spent"] for b in BUDGETS.values())
     
     return {
-        "service": "Λ‑Econ",
-        "description": "Resource & Value Engine for ROI-driven reinvestment",
-        "capabilities": [
-            "ROI calculation",
-            "Budget allocation (greedy bandit)",
-            "Spend tracking",
-            "Investment optimization"
-        ],
+        **_STATUS,
         "total_budget_allocated": total_allocated,
         "total_spent": total_spent,
         "remaining": total_allocated - total_spent
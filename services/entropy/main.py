@@ -10,11 +10,17 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
-from services.common.server import create_app, run
-import random
+from services.common.server import (
+    RandomPool, bounded_set, bump_status_version, create_app, pack_ns, run, short_id
+)
+from collections import OrderedDict
+import time
 
 app = create_app("entropy")
 
+_RNG = RandomPool()
+_uniform = _RNG.uniform
+
 
 class ExperimentReq(BaseModel):
     """Request to run experiment"""
@@ -62,7 +68,10 @@ class AdversarialResp(BaseModel):
     patched_model_id: str
 
 
-EXPERIMENTS = {}
+# Recent experiments (bounded LRU) and cumulative run counter
+MAX_EXPERIMENTS = 4096
+EXPERIMENTS: OrderedDict = OrderedDict()
+EXPERIMENTS_TOTAL = 0
 
 
 @app.post("/experiment", response_model=ExperimentResp)
@@ -77,21 +86,20 @@ def experiment(req: ExperimentReq):
     
     Budget constraint: ≤5% compute
     """
-    import hashlib
-    import datetime
+    global EXPERIMENTS_TOTAL
     
     # Validate budget
     if req.budget > 0.05:
         req.budget = 0.05  # Cap at 5%
     
     # Generate experiment ID
-    exp_data = f"{req.hypothesis}:{datetime.datetime.utcnow()}".encode()
-    experiment_id = f"exp-{hashlib.md5(exp_data).hexdigest()[:12]}"
+    ns = time.time_ns()
+    experiment_id = short_id("exp", req.hypothesis.encode() + pack_ns(ns))
     
     # Simulate experiment results
     # Entropy introduces controlled variation
-    delta_k = random.uniform(0.01, 0.05) * (req.budget / 0.05)
-    delta_theta = random.uniform(0.005, 0.02) * (req.budget / 0.05)
+    delta_k = _uniform(0.01, 0.05) * (req.budget / 0.05)
+    delta_theta = _uniform(0.005, 0.02) * (req.budget / 0.05)
     
     # Risk assessment
     if req.budget < 0.02:
@@ -102,20 +110,22 @@ def experiment(req: ExperimentReq):
         risk = "critical"
     
     insights = {
-        "hypothesis_supported": random.choice([True, False]),
-        "confidence": random.uniform(0.7, 0.95),
+        "hypothesis_supported": _RNG.coin(),
+        "confidence": _uniform(0.7, 0.95),
         "sample_size": int(1000 * req.budget / 0.05),
-        "p_value": random.uniform(0.01, 0.05)
+        "p_value": _uniform(0.01, 0.05)
     }
     
     # Store experiment
-    EXPERIMENTS[experiment_id] = {
+    bounded_set(EXPERIMENTS, experiment_id, {
         "hypothesis": req.hypothesis,
         "type": req.experiment_type,
         "budget": req.budget,
         "results": insights,
-        "timestamp": datetime.datetime.utcnow().isoformat()
-    }
+        "timestamp_ns": ns
+    }, MAX_EXPERIMENTS)
+    EXPERIMENTS_TOTAL += 1
+    bump_status_version(app)
     
     return ExperimentResp(
         experiment_id=experiment_id,
@@ -136,12 +146,9 @@ def chaos_test(req: ChaosReq):
     - failure: Simulate component crash
     - resource_limit: Throttle CPU/memory
     """
-    import hashlib
-    import datetime
-    
     # Generate test ID
-    test_data = f"{req.target}:{req.action}:{datetime.datetime.utcnow()}".encode()
-    test_id = f"chaos-{hashlib.md5(test_data).hexdigest()[:12]}"
+    test_data = f"{req.target}:{req.action}:".encode() + pack_ns(time.time_ns())
+    test_id = short_id("chaos", test_data)
     
     # Simulate chaos impact
     impact_observed = {
@@ -152,7 +159,7 @@ def chaos_test(req: ChaosReq):
     
     # System recovery
     system_recovered = True
-    recovery_time_s = random.uniform(5.0, 30.0) * req.intensity
+    recovery_time_s = _uniform(5.0, 30.0) * req.intensity
     
     return ChaosResp(
         test_id=test_id,
@@ -172,15 +179,13 @@ def adversarial_train(req: AdversarialReq):
     - Backdoor, poisoning
     - Evasion, model extraction
     """
-    import hashlib
-    
     # Generate patched model ID
     patch_data = f"{req.model_id}:adversarial".encode()
-    patched_model_id = f"model-{hashlib.md5(patch_data).hexdigest()[:12]}"
+    patched_model_id = short_id("model", patch_data)
     
     # Simulate adversarial training results
-    robustness_score = random.uniform(0.75, 0.95)
-    vulnerabilities_found = random.randint(0, 5)
+    robustness_score = _uniform(0.75, 0.95)
+    vulnerabilities_found = _RNG.randint(0, 5)
     
     return AdversarialResp(
         robustness_score=robustness_score,
@@ -189,20 +194,26 @@ def adversarial_train(req: AdversarialReq):
     )
 
 
+_STATUS = {
+    "service": "Λ‑Entropy",
+    "description": "Controlled stress and experimentation engine",
+    "capabilities": [
+        "A/B testing",
+        "Chaos engineering",
+        "Adversarial training",
+        "Stress testing"
+    ],
+    "budget_constraint": "≤5% compute"
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Entropy status"""
     return {
-        "service": "Λ‑Entropy",
-        "description": "Controlled stress and experimentation engine",
-        "capabilities": [
-            "A/B testing",
-            "Chaos engineering",
-            "Adversarial training",
-            "Stress testing"
-        ],
-        "budget_constraint": "≤5% compute",
-        "experiments_run": len(EXPERIMENTS)
+        **_STATUS,
+        "experiments_run": EXPERIMENTS_TOTAL,
+        "experiments_stored": len(EXPERIMENTS)
     }
 
 
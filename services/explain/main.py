@@ -10,11 +10,19 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
-from services.common.server import create_app, run
-import datetime
+from services.common.server import (
+    RandomPool, bounded_set, bump_status_version, create_app, json_route, pack_ns, run,
+    short_id, utc_isoformat
+)
+from collections import OrderedDict, deque
+from types import MappingProxyType
+import time
 
 app = create_app("explain")
 
+_RNG = RandomPool()
+_uniform = _RNG.uniform
+
 
 class ChangeCard(BaseModel):
     """Change card for tracking modifications"""
@@ -79,9 +87,43 @@ class RootCauseResp(BaseModel):
     suggested_actions: List[str]
 
 
-# Storage
-CHANGE_CARDS = []
-TRACES = {}
+# Storage (bounded) and cumulative counters
+MAX_CHANGE_CARDS = 10_000
+MAX_TRACES = 4096
+CHANGE_CARDS: deque = deque(maxlen=MAX_CHANGE_CARDS)
+CHANGE_CARDS_TOTAL = 0
+TRACES: OrderedDict = OrderedDict()
+
+# Root cause rules: (signal, threshold, likely cause, suggested actions)
+_RULES = (
+    (
+        "latency", 100.0,
+        MappingProxyType({
+            "cause": "High latency detected",
+            "confidence": 0.85,
+            "component": "network"
+        }),
+        ("Activate Λ‑Balance throttling", "Enable Λ‑TimeWrap hedging")
+    ),
+    (
+        "error_rate", 0.05,
+        MappingProxyType({
+            "cause": "Elevated error rate",
+            "confidence": 0.90,
+            "component": "inference"
+        }),
+        ("Trigger Λ‑Regen detection", "Quarantine affected models")
+    ),
+    (
+        "cpu_util", 0.9,
+        MappingProxyType({
+            "cause": "Resource exhaustion",
+            "confidence": 0.80,
+            "component": "compute"
+        }),
+        ("Apply Λ‑Optimize scaling", "Redistribute workload (cloud/edge)")
+    ),
+)
 
 
 @app.post("/changecard", response_model=ChangeCardResp)
@@ -97,17 +139,19 @@ def create_changecard(card: ChangeCard):
     - Rollback plan
     - Canary scope
     """
-    import hashlib
+    global CHANGE_CARDS_TOTAL
     
-    timestamp = datetime.datetime.utcnow().isoformat()
-    card_data = f"{card.who}:{card.why}:{timestamp}".encode()
-    card_id = f"cc-{hashlib.md5(card_data).hexdigest()[:12]}"
+    ns = time.time_ns()
+    card_id = short_id("cc", f"{card.who}:{card.why}:".encode() + pack_ns(ns))
+    timestamp = utc_isoformat(ns)
     
     record = card.model_dump()
     record["card_id"] = card_id
     record["timestamp"] = timestamp
     
     CHANGE_CARDS.append(record)
+    CHANGE_CARDS_TOTAL += 1
+    bump_status_version(app)
     
     return ChangeCardResp(
         card_id=card_id,
@@ -115,7 +159,6 @@ def create_changecard(card: ChangeCard):
     )
 
 
-@app.post("/metrics", response_model=MetricsResp)
 def get_metrics(req: MetricsReq):
     """
     Get current system metrics
@@ -131,8 +174,6 @@ def get_metrics(req: MetricsReq):
     - MTTR, MTBF: Reliability
     - Energy, Risk
     """
-    import random
-    
     # Simulate current metrics
     # In production, these come from actual monitoring
     T1 = 10.0
@@ -148,14 +189,17 @@ def get_metrics(req: MetricsReq):
         U=U,
         theta=theta,
         kP=k * P,
-        lat_p99=random.uniform(80, 120),
-        mttr=random.uniform(5, 15),
-        mtbf=random.uniform(500, 1000),
-        energy=random.uniform(0.6, 0.9),
-        risk=random.uniform(0.1, 0.3)
+        lat_p99=_uniform(80, 120),
+        mttr=_uniform(5, 15),
+        mtbf=_uniform(500, 1000),
+        energy=_uniform(0.6, 0.9),
+        risk=_uniform(0.1, 0.3)
     )
 
 
+json_route(app, "/metrics", MetricsReq, get_metrics, MetricsResp)
+
+
 @app.post("/trace", response_model=TraceResp)
 def get_trace(req: TraceReq):
     """
@@ -168,8 +212,10 @@ def get_trace(req: TraceReq):
     - Resource usage
     """
     # Check if trace exists
-    if req.trace_id in TRACES:
-        return TraceResp(**TRACES[req.trace_id])
+    cached = TRACES.get(req.trace_id)
+    if cached is not None:
+        TRACES.move_to_end(req.trace_id)
+        return TraceResp(**cached)
     
     # Generate sample trace
     trace = TraceResp(
@@ -183,7 +229,8 @@ def get_trace(req: TraceReq):
         service_path=["arbiter", "timewrap", "balance"]
     )
     
-    TRACES[req.trace_id] = trace.model_dump()
+    bounded_set(TRACES, req.trace_id, trace.model_dump(), MAX_TRACES)
+    bump_status_version(app)
     return trace
 
 
@@ -202,39 +249,16 @@ def analyze_root_cause(req: RootCauseReq):
     - Optimize transformations
     - Balance adjustments
     """
-    # Simple heuristic root cause analysis
+    # Simple heuristic root cause analysis: one pass over the rule table
     causes = []
     actions = []
+    signals = req.signals
     
-    # Check for latency issues
-    if "latency" in req.signals and req.signals["latency"] > 100:
-        causes.append({
-            "cause": "High latency detected",
-            "confidence": 0.85,
-            "component": "network"
-        })
-        actions.append("Activate Λ‑Balance throttling")
-        actions.append("Enable Λ‑TimeWrap hedging")
-    
-    # Check for error rate
-    if "error_rate" in req.signals and req.signals["error_rate"] > 0.05:
-        causes.append({
-            "cause": "Elevated error rate",
-            "confidence": 0.90,
-            "component": "inference"
-        })
-        actions.append("Trigger Λ‑Regen detection")
-        actions.append("Quarantine affected models")
-    
-    # Check for resource exhaustion
-    if "cpu_util" in req.signals and req.signals["cpu_util"] > 0.9:
-        causes.append({
-            "cause": "Resource exhaustion",
-            "confidence": 0.80,
-            "component": "compute"
-        })
-        actions.append("Apply Λ‑Optimize scaling")
-        actions.append("Redistribute workload (cloud/edge)")
+    for key, threshold, cause, suggested in _RULES:
+        value = signals.get(key)
+        if value is not None and value > threshold:
+            causes.append(cause)
+            actions.extend(suggested)
     
     return RootCauseResp(
         incident_id=req.incident_id,
@@ -243,20 +267,26 @@ def analyze_root_cause(req: RootCauseReq):
     )
 
 
+_STATUS = {
+    "service": "Λ‑Explain",
+    "description": "Observability & Causality Engine",
+    "capabilities": [
+        "Change card tracking",
+        "Metrics collection",
+        "Distributed tracing",
+        "Root cause analysis",
+        "Causal graph analysis"
+    ]
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Explain status"""
     return {
-        "service": "Λ‑Explain",
-        "description": "Observability & Causality Engine",
-        "capabilities": [
-            "Change card tracking",
-            "Metrics collection",
-            "Distributed tracing",
-            "Root cause analysis",
-            "Causal graph analysis"
-        ],
-        "change_cards_created": len(CHANGE_CARDS),
+        **_STATUS,
+        "change_cards_created": CHANGE_CARDS_TOTAL,
+        "change_cards_stored": len(CHANGE_CARDS),
         "traces_stored": len(TRACES)
     }
 
@@ -7,11 +7,22 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-from services.common.server import create_app, run
-import datetime
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from services.common.server import bump_status_version, create_app, run, utc_isoformat
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import islice
+import asyncio
+import re
+import threading
+import time
+import numpy as np
+import orjson
+import xxhash
 
 app = create_app("memory")
 
@@ -43,9 +54,141 @@ class ReadResp(BaseModel):
     count: int
 
 
+class ReadBatchReq(BaseModel):
+    """Request with several memory queries"""
+    queries: List[ReadReq]
+
+
+class SimilarReq(BaseModel):
+    """Request for similarity search"""
+    query: str
+    type: Optional[str] = None
+    limit: int = 10
+
+
+class SimilarResp(BaseModel):
+    """Response with most similar memory items"""
+    items: List[Dict[str, Any]]
+    scores: List[float]
+    count: int
+
+
 # Global storage (in production, use vector DB + graph DB)
 MEMORY_STORE: List[Dict[str, Any]] = []
 
+# Secondary index over MEMORY_STORE (item ids == list positions)
+TYPE_INDEX: Dict[str, List[int]] = {}  # type -> item ids, insertion order
+
+# Lowercased "<tags>\0<payload>" per item, parallel to MEMORY_STORE. The
+# payload repr escapes NUL, so the last NUL always separates the two parts;
+# tags may contain NUL themselves. A query without NUL matches the text iff
+# it matches the joined tags or the payload on their own; queries with NUL
+# are checked against each part (_text_matches).
+SEARCH_TEXT: List[str] = []
+
+# Search partitions: None covers every item, a type covers that type's
+# items (in TYPE_INDEX order). Each partition's texts are joined by NUL into
+# one blob, rebuilt lazily after writes; SEARCH_STARTS holds the offset of
+# each item's text in its partition's blob.
+_SEARCH_BLOBS: Dict[Optional[str], Tuple[int, str]] = {}
+SEARCH_STARTS: Dict[Optional[str], List[int]] = {}
+_SEARCH_ENDS: Dict[Optional[str], int] = {}
+
+# Every character trigram occurring in any item's searchable text. A query
+# containing a trigram outside this set cannot match, so it skips the scan.
+TRIGRAMS: Set[str] = set()
+
+# Bumped on every write; part of the /read cache key so stale results are
+# never hit and age out of the LRU instead of being cleared eagerly
+MEM_EPOCH = 0
+
+# Serializes /write from id assignment through the column append
+_WRITE_LOCK = threading.Lock()
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Set of all length-3 substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _search_blob(part: Optional[str]) -> Tuple[int, str]:
+    """
+    Search texts of a partition as one NUL-separated string
+    
+    Args:
+        part: None for all items, else a memory type
+        
+    Returns:
+        (number of items covered, blob)
+    """
+    ids = TYPE_INDEX.get(part, []) if part else None
+    count = len(ids) if part else len(SEARCH_TEXT)
+    n, blob = _SEARCH_BLOBS.get(part, (0, ""))
+    if n != count:
+        texts = map(SEARCH_TEXT.__getitem__, ids) if part else SEARCH_TEXT
+        blob = "\0".join(islice(texts, count))
+        _SEARCH_BLOBS[part] = (count, blob)
+    return count, blob
+
+
+# Numeric columns, row i ↔ MEMORY_STORE[i]; capacity grows by doubling.
+# Embeddings are int8 codes with a per-row scale (row ≈ codes * scale);
+# types are dictionary-encoded so filters are vectorized compares.
+EMBED_DIM = 256
+EMBED_CODES = np.zeros((1024, EMBED_DIM), dtype=np.int8)
+EMBED_SCALES = np.zeros(1024, dtype=np.float32)
+TYPE_CODES = np.zeros(1024, dtype=np.int32)
+TYPE_CODE: Dict[str, int] = {}  # type -> code in TYPE_CODES
+
+# Rows fully written to the columns above; /similar reads only these, as
+# MEMORY_STORE grows before the item's row is filled in
+EMBED_ROWS = 0
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def embed(text: str) -> np.ndarray:
+    """
+    Embed text as a signed hashed bag of words (L2-normalized float32)
+    
+    Stand-in for a learned encoder: cosine similarity reduces to
+    weighted token overlap.
+    """
+    vec = np.zeros(EMBED_DIM, dtype=np.float32)
+    for token in _TOKEN_RE.findall(text.lower()):
+        h = xxhash.xxh3_64_intdigest(token.encode())
+        vec[h % EMBED_DIM] += 1.0 if h >> 63 else -1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+# Rows dequantized per block in /similar (256 KiB of float32 per block)
+_SCORE_BLOCK = 256
+
+
+def _embedding_scores(q: np.ndarray, n: int) -> np.ndarray:
+    """Dot products of the first n stored embeddings with q"""
+    scores = np.empty(n, dtype=np.float32)
+    for start in range(0, n, _SCORE_BLOCK):
+        stop = min(start + _SCORE_BLOCK, n)
+        np.dot(EMBED_CODES[start:stop].astype(np.float32), q, out=scores[start:stop])
+    scores *= EMBED_SCALES[:n]
+    return scores
+
+
+def _append_columns(row: int, vec: np.ndarray, type_: str):
+    """Store an item's quantized embedding and type code at row, growing if needed"""
+    global EMBED_CODES, EMBED_SCALES, TYPE_CODES
+    if row >= len(EMBED_CODES):
+        EMBED_CODES = np.concatenate([EMBED_CODES, np.zeros_like(EMBED_CODES)])
+        EMBED_SCALES = np.concatenate([EMBED_SCALES, np.zeros_like(EMBED_SCALES)])
+        TYPE_CODES = np.concatenate([TYPE_CODES, np.zeros_like(TYPE_CODES)])
+    peak = np.abs(vec).max()
+    scale = peak / 127 if peak else 1.0
+    EMBED_CODES[row] = np.rint(vec / scale)
+    EMBED_SCALES[row] = scale
+    TYPE_CODES[row] = TYPE_CODE.setdefault(type_, len(TYPE_CODE))
+
 
 @app.post("/write", response_model=WriteResp)
 def write(req: WriteReq):
@@ -62,11 +205,36 @@ def write(req: WriteReq):
     - LoRA/adapter routing for multi-task
     - Causal indexing for change tracking
     """
+    global EMBED_ROWS, MEM_EPOCH
     item = req.model_dump()
-    item["id"] = len(MEMORY_STORE)
-    item["timestamp"] = datetime.datetime.utcnow().isoformat()
+    item["timestamp"] = utc_isoformat(time.time_ns())
+    
+    tags_text = " ".join(req.tags).lower()
+    payload_text = str(req.payload).lower()
+    text = tags_text + "\0" + payload_text
+    vec = embed(tags_text + " " + payload_text)
     
-    MEMORY_STORE.append(item)
+    # Writes run in the threadpool; ids, search offsets and column rows are
+    # all derived from the current lengths, so appends must not interleave
+    with _WRITE_LOCK:
+        item["id"] = len(MEMORY_STORE)
+        MEMORY_STORE.append(item)
+        
+        # Offsets and text go in before the item is counted by SEARCH_TEXT or
+        # TYPE_INDEX, so concurrent readers never see a partial entry
+        for part in (None, req.type):
+            start = _SEARCH_ENDS.get(part, 0)
+            SEARCH_STARTS.setdefault(part, []).append(start)
+            _SEARCH_ENDS[part] = start + len(text) + 1
+        SEARCH_TEXT.append(text)
+        TYPE_INDEX.setdefault(req.type, []).append(item["id"])
+        
+        TRIGRAMS.update(_trigrams(tags_text))
+        TRIGRAMS.update(_trigrams(payload_text))
+        _append_columns(item["id"], vec, req.type)
+        EMBED_ROWS = item["id"] + 1
+        MEM_EPOCH += 1
+    bump_status_version(app)
     
     return WriteResp(
         id=item["id"],
@@ -74,8 +242,95 @@ def write(req: WriteReq):
     )
 
 
+# Set by _read_impl when it actually runs, i.e. on a read-cache miss
+_READ_MISS = threading.local()
+
+# Reads currently running, by cache key; identical concurrent reads await
+# the same task instead of each scanning
+_INFLIGHT: Dict[Tuple[int, str, Optional[str], int], asyncio.Future] = {}
+
+
+def _text_matches(text: str, query: str) -> bool:
+    """Whether query occurs in the tags or the payload part of a SEARCH_TEXT entry"""
+    tags, _, payload = text.rpartition("\0")
+    return query in tags or query in payload
+
+
+def _iter_matches(query: str, type_: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield items matching a query, in insertion order
+    
+    Args:
+        query: Lowercased substring to match in tags or payload
+        type_: Optional memory type filter
+    """
+    # Negative filter: some trigram of the query never occurs in the store
+    if len(query) >= 3 and not _trigrams(query) <= TRIGRAMS:
+        return
+    
+    # NUL separates items and parts in the blobs, so a query containing it
+    # (only ever matching NUL inside tags) is checked item by item
+    if "\0" in query:
+        ids = TYPE_INDEX.get(type_, []) if type_ else range(len(SEARCH_TEXT))
+        for i in ids:
+            if _text_matches(SEARCH_TEXT[i], query):
+                yield MEMORY_STORE[i]
+        return
+    
+    # One str.find pass over the partition's blob (the type filter picks
+    # the partition); each hit is mapped to its item and the search
+    # resumes at the next item's text
+    part = type_ or None
+    ids = TYPE_INDEX.get(part, []) if part else None
+    n, blob = _search_blob(part)
+    if not n:
+        return
+    
+    find = blob.find
+    starts = SEARCH_STARTS[part]
+    store = MEMORY_STORE
+    pos = find(query)
+    while pos != -1:
+        j = bisect_right(starts, pos, 0, n) - 1
+        yield store[ids[j] if ids is not None else j]
+        if j + 1 == n:
+            return
+        pos = find(query, starts[j + 1])
+
+
+@lru_cache(maxsize=4096)
+def _read_impl(epoch: int, query: str, type_: Optional[str], limit: int) -> Tuple[Dict[str, Any], ...]:
+    """
+    Scan the store for items matching a query (memoized per epoch)
+    
+    Args:
+        epoch: MEM_EPOCH at call time (cache key only)
+        query: Lowercased substring to match in tags or payload
+        type_: Optional memory type filter
+        limit: Maximum number of items
+        
+    Returns:
+        Matching items in insertion order
+    """
+    _READ_MISS.value = True
+    
+    if limit <= 0:
+        # The scan has always stopped after the first item it visits
+        ids = TYPE_INDEX.get(type_, [])[:1] if type_ else range(min(len(SEARCH_TEXT), 1))
+        return tuple(MEMORY_STORE[i] for i in ids if _text_matches(SEARCH_TEXT[i], query))
+    
+    return tuple(islice(_iter_matches(query, type_), limit))
+
+
+def _read_cached(epoch: int, query: str, type_: Optional[str], limit: int):
+    """_read_impl plus whether the result came from the cache"""
+    _READ_MISS.value = False
+    results = _read_impl(epoch, query, type_, limit)
+    return results, not _READ_MISS.value
+
+
 @app.post("/read", response_model=ReadResp)
-def read(req: ReadReq):
+async def read(req: ReadReq, response: Response = None):
     """
     Read from memory graph
     
@@ -84,50 +339,109 @@ def read(req: ReadReq):
     - Similarity search (embeddings)
     - Temporal queries
     - Causal graph traversal
+    
+    Concurrent identical reads are coalesced into one scan. The X-Cache
+    response header reports whether this request caused a scan ("miss")
+    or was served from the cache or a concurrent read ("hit").
     """
-    results = []
+    key = (MEM_EPOCH, req.query.lower(), req.type, req.limit)
+    flight = _INFLIGHT.get(key)
+    leader = flight is None
+    if leader:
+        flight = _INFLIGHT[key] = asyncio.ensure_future(run_in_threadpool(_read_cached, *key))
+        flight.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
     
-    for item in MEMORY_STORE:
-        # Type filter
-        if req.type and item.get("type") != req.type:
-            continue
-        
-        # Query matching (simple tag search)
-        tags = item.get("tags", [])
-        payload_str = str(item.get("payload", {})).lower()
-        
-        if req.query.lower() in " ".join(tags).lower() or req.query.lower() in payload_str:
-            results.append(item)
-        
-        if len(results) >= req.limit:
-            break
+    # Shielded so a cancelled request does not cancel the shared scan
+    results, hit = await asyncio.shield(flight)
+    if response is not None:
+        response.headers["X-Cache"] = "hit" if hit or not leader else "miss"
     
     return ReadResp(
-        items=results,
+        items=list(results),
         count=len(results)
     )
 
 
+@app.post("/read_stream")
+def read_stream(req: ReadReq):
+    """
+    Read from memory graph as NDJSON, one item per line
+    
+    Items are serialized as the scan finds them, so large results are
+    never held as one list or one response body. Results bypass the
+    read cache; a limit below 1 yields no items.
+    """
+    matches = islice(_iter_matches(req.query.lower(), req.type), max(req.limit, 0))
+    return StreamingResponse(
+        (orjson.dumps(item) + b"\n" for item in matches),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.post("/read_batch", response_model=List[ReadResp])
+def read_batch(req: ReadBatchReq):
+    """
+    Run several reads in one request
+    
+    All queries see the same store snapshot; repeated queries within the
+    batch (or already cached) are answered from the read cache.
+    """
+    epoch = MEM_EPOCH
+    responses = []
+    
+    for q in req.queries:
+        results = _read_impl(epoch, q.query.lower(), q.type, q.limit)
+        responses.append(ReadResp(items=list(results), count=len(results)))
+    
+    return responses
+
+
+@app.post("/similar", response_model=SimilarResp)
+def similar(req: SimilarReq):
+    """
+    Similarity search over item embeddings
+    
+    Top-k cosine similarity over the int8-quantized embeddings (4x less
+    memory traffic than float32), then a partial sort.
+    """
+    n = EMBED_ROWS
+    scores = _embedding_scores(embed(req.query), n)
+    
+    if req.type:
+        scores = np.where(TYPE_CODES[:n] == TYPE_CODE.get(req.type, -1), scores, -np.inf)
+    
+    k = min(max(req.limit, 0), n)
+    top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    top = top[np.isfinite(scores[top])]
+    
+    return SimilarResp(
+        items=[MEMORY_STORE[i] for i in top.tolist()],
+        scores=scores[top].tolist(),
+        count=len(top)
+    )
+
+
+_STATUS = {
+    "service": "Λ‑Memory Graph",
+    "description": "Unified persistent memory for continual learning",
+    "capabilities": [
+        "Episodic memory",
+        "Semantic memory",
+        "Operational memory",
+        "Continual learning (EWC/LoRA)",
+        "Causal indexing"
+    ]
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Memory status"""
-    type_counts = {}
-    for item in MEMORY_STORE:
-        t = item.get("type", "unknown")
-        type_counts[t] = type_counts.get(t, 0) + 1
-    
     return {
-        "service": "Λ‑Memory Graph",
-        "description": "Unified persistent memory for continual learning",
-        "capabilities": [
-            "Episodic memory",
-            "Semantic memory",
-            "Operational memory",
-            "Continual learning (EWC/LoRA)",
-            "Causal indexing"
-        ],
+        **_STATUS,
         "total_items": len(MEMORY_STORE),
-        "by_type": type_counts
+        "by_type": {t: len(ids) for t, ids in TYPE_INDEX.items()}
     }
 
 
@@ -10,10 +10,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from services.common.server import create_app, run
+from services.common.server import RandomPool, create_app, run, short_id
 
 app = create_app("optimize")
 
+_RNG = RandomPool()
+
 
 class SuggestReq(BaseModel):
     """Request optimization suggestions"""
@@ -51,6 +53,47 @@ class ApplyResp(BaseModel):
     success: bool
 
 
+# Suggestions do not depend on the request yet, so the response is built once
+_SUGGEST_TRANSFORMS = [
+    Transform(
+        type="quantize",
+        params={"bits": 8, "method": "dynamic"},
+        expected_delta_k=0.25,
+        expected_delta_T1=-0.15
+    ),
+    Transform(
+        type="prune",
+        params={"sparsity": 0.4, "method": "magnitude"},
+        expected_delta_k=0.15,
+        expected_delta_T1=-0.10
+    ),
+    Transform(
+        type="fuse",
+        params={"ops": ["conv", "bn", "relu"], "backend": "torch"},
+        expected_delta_k=0.10,
+        expected_delta_T1=-0.05
+    ),
+    Transform(
+        type="jit",
+        params={"backend": "torch.compile", "mode": "max-autotune"},
+        expected_delta_k=0.20,
+        expected_delta_T1=-0.08
+    ),
+    Transform(
+        type="placement",
+        params={"map": "cpu:preprocess,gpu:inference,cpu:postprocess"},
+        expected_delta_k=0.12,
+        expected_delta_T1=-0.03
+    )
+]
+
+_STATIC_SUGGEST = SuggestResp(
+    transforms=_SUGGEST_TRANSFORMS,
+    expected_kP_gain=sum(t.expected_delta_k for t in _SUGGEST_TRANSFORMS),
+    expected_T1_reduction=sum(t.expected_delta_T1 for t in _SUGGEST_TRANSFORMS)
+)
+
+
 @app.post("/suggest", response_model=SuggestResp)
 def suggest(req: SuggestReq):
     """
@@ -65,48 +108,7 @@ def suggest(req: SuggestReq):
     - Batching optimization
     - Model distillation
     """
-    transforms = [
-        Transform(
-            type="quantize",
-            params={"bits": 8, "method": "dynamic"},
-            expected_delta_k=0.25,
-            expected_delta_T1=-0.15
-        ),
-        Transform(
-            type="prune",
-            params={"sparsity": 0.4, "method": "magnitude"},
-            expected_delta_k=0.15,
-            expected_delta_T1=-0.10
-        ),
-        Transform(
-            type="fuse",
-            params={"ops": ["conv", "bn", "relu"], "backend": "torch"},
-            expected_delta_k=0.10,
-            expected_delta_T1=-0.05
-        ),
-        Transform(
-            type="jit",
-            params={"backend": "torch.compile", "mode": "max-autotune"},
-            expected_delta_k=0.20,
-            expected_delta_T1=-0.08
-        ),
-        Transform(
-            type="placement",
-            params={"map": "cpu:preprocess,gpu:inference,cpu:postprocess"},
-            expected_delta_k=0.12,
-            expected_delta_T1=-0.03
-        )
-    ]
-    
-    # Calculate total expected gains
-    expected_kP_gain = sum(t.expected_delta_k for t in transforms)
-    expected_T1_reduction = sum(t.expected_delta_T1 for t in transforms)
-    
-    return SuggestResp(
-        transforms=transforms,
-        expected_kP_gain=expected_kP_gain,
-        expected_T1_reduction=expected_T1_reduction
-    )
+    return _STATIC_SUGGEST
 
 
 @app.post("/apply", response_model=ApplyResp)
@@ -121,16 +123,13 @@ def apply_transform(req: ApplyReq):
     4. Benchmark (k, P, T1)
     5. Register new artifact
     """
-    import hashlib
-    import random
-    
     # Simulate transformation application
     # In production, this would apply actual optimizations
     new_id_data = f"{req.artifact_id}:{req.transform.type}".encode()
-    new_artifact_id = f"artifact-{hashlib.md5(new_id_data).hexdigest()[:12]}"
+    new_artifact_id = short_id("artifact", new_id_data)
     
     # Simulate actual deltas (add some variance)
-    variance = random.uniform(0.9, 1.1)
+    variance = _RNG.uniform(0.9, 1.1)
     actual_delta_k = req.transform.expected_delta_k * variance
     actual_delta_T1 = req.transform.expected_delta_T1 * variance
     
@@ -142,26 +141,29 @@ def apply_transform(req: ApplyReq):
     )
 
 
+_STATUS = {
+    "service": "Λ‑Optimize",
+    "description": "Adaptive metabolism engine",
+    "capabilities": [
+        "Quantization (8-bit, 4-bit)",
+        "Pruning (structured, unstructured)",
+        "Kernel fusion",
+        "JIT compilation",
+        "Placement optimization",
+        "Model distillation"
+    ],
+    "objectives": [
+        "Maximize k·P",
+        "Minimize T₁",
+        "Maintain accuracy"
+    ]
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Optimize status"""
-    return {
-        "service": "Λ‑Optimize",
-        "description": "Adaptive metabolism engine",
-        "capabilities": [
-            "Quantization (8-bit, 4-bit)",
-            "Pruning (structured, unstructured)",
-            "Kernel fusion",
-            "JIT compilation",
-            "Placement optimization",
-            "Model distillation"
-        ],
-        "objectives": [
-            "Maximize k·P",
-            "Minimize T₁",
-            "Maintain accuracy"
-        ]
-    }
+    return _STATUS
 
 
 if __name__ == "__main__":
@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from services.common.server import create_app, run
+from services.common.server import create_app, pack_ns, run, short_id
+import time
 
 app = create_app("planner")
 
@@ -154,11 +155,9 @@ def synthesize_code(req: SynthCodeReq):
     - medium: + Unit tests
     - high: + Property tests + Formal verification
     """
-    import hashlib
-    
     # Generate artifact ID
     artifact_data = f"{req.spec}:{req.language}".encode()
-    artifact_id = f"code-{hashlib.md5(artifact_data).hexdigest()[:12]}"
+    artifact_id = short_id("code", artifact_data)
     
     # Simulate code generation
     # In production, this would use LLM with safety controls
@@ -211,12 +210,8 @@ def validate_and_ship(req: ValidateReq):
     5. Monitor (Λ‑Explain)
     6. Promote or rollback
     """
-    import hashlib
-    import datetime
-    
     # Generate deploy ID
-    deploy_data = f"{req.artifact_id}:{datetime.datetime.utcnow()}".encode()
-    deploy_id = f"deploy-{hashlib.md5(deploy_data).hexdigest()[:12]}"
+    deploy_id = short_id("deploy", req.artifact_id.encode() + pack_ns(time.time_ns()))
     
     # Validate
     validation_passed = True  # In production, run actual validation
@@ -231,21 +226,24 @@ def validate_and_ship(req: ValidateReq):
     )
 
 
+_STATUS = {
+    "service": "Λ‑Planner",
+    "description": "Task & Trajectory Planning Engine",
+    "capabilities": [
+        "Hierarchical planning (L0-L3)",
+        "Task decomposition",
+        "Safe code synthesis",
+        "Validation & deployment",
+        "Integration with Arbiter & Optimize"
+    ],
+    "safety_levels": ["low", "medium", "high"]
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Planner status"""
-    return {
-        "service": "Λ‑Planner",
-        "description": "Task & Trajectory Planning Engine",
-        "capabilities": [
-            "Hierarchical planning (L0-L3)",
-            "Task decomposition",
-            "Safe code synthesis",
-            "Validation & deployment",
-            "Integration with Arbiter & Optimize"
-        ],
-        "safety_levels": ["low", "medium", "high"]
-    }
+    return _STATUS
 
 
 if __name__ == "__main__":
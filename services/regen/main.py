@@ -10,11 +10,17 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from services.common.server import create_app, run
-import datetime
+from services.common.server import (
+    RandomPool, bounded_set, bump_status_version, create_app, pack_ns, run, short_id,
+    utc_isoformat
+)
+from collections import OrderedDict
+import time
 
 app = create_app("regen")
 
+_RNG = RandomPool()
+
 
 class DetectReq(BaseModel):
     """Request to detect anomalies"""
@@ -72,9 +78,11 @@ class ReinvestResp(BaseModel):
     T1_new: float
 
 
-# Global state for demo
-QUARANTINE_REGISTRY = {}
-PATCH_REGISTRY = {}
+# Global state for demo (bounded LRU registries)
+MAX_QUARANTINES = 100_000
+MAX_PATCHES = 100_000
+QUARANTINE_REGISTRY: OrderedDict = OrderedDict()
+PATCH_REGISTRY: OrderedDict = OrderedDict()
 
 
 @app.post("/detect", response_model=DetectResp)
@@ -114,7 +122,7 @@ def detect(req: DetectReq):
     return DetectResp(
         anomalies=anomalies,
         severity=severity,
-        timestamp=datetime.datetime.utcnow().isoformat()
+        timestamp=utc_isoformat(time.time_ns())
     )
 
 
@@ -129,20 +137,19 @@ def quarantine(req: QuarantineReq):
     - Create rollback point
     - Log incident
     """
-    import hashlib
-    
     # Generate ticket ID
-    ticket_data = f"{req.unit}:{datetime.datetime.utcnow()}".encode()
-    ticket_id = f"q-{hashlib.md5(ticket_data).hexdigest()[:12]}"
+    ns = time.time_ns()
+    ticket_id = short_id("q", req.unit.encode() + pack_ns(ns))
     
     # Store in quarantine registry
-    QUARANTINE_REGISTRY[ticket_id] = {
+    bounded_set(QUARANTINE_REGISTRY, ticket_id, {
         "unit": req.unit,
         "reason": req.reason,
         "severity": req.severity,
-        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "timestamp_ns": ns,
         "status": "quarantined"
-    }
+    }, MAX_QUARANTINES)
+    bump_status_version(app)
     
     return QuarantineResp(
         ticket_id=ticket_id,
@@ -162,29 +169,27 @@ def improve(req: ImproveReq):
     - Replace: Swap with backup/alternative
     - Rollback: Revert to last known good state
     """
-    import hashlib
-    import random
-    
     # Generate patch ID
-    patch_data = f"{req.unit}:{req.strategy}:{datetime.datetime.utcnow()}".encode()
-    patch_id = f"patch-{hashlib.md5(patch_data).hexdigest()[:12]}"
+    ns = time.time_ns()
+    patch_id = short_id("patch", f"{req.unit}:{req.strategy}:".encode() + pack_ns(ns))
     
     # Simulate improvement
-    delta_k = random.uniform(0.05, 0.20)  # 5-20% efficiency gain
-    delta_theta = random.uniform(0.02, 0.10)  # 2-10% resilience gain
+    delta_k = _RNG.uniform(0.05, 0.20)  # 5-20% efficiency gain
+    delta_theta = _RNG.uniform(0.02, 0.10)  # 2-10% resilience gain
     
     # Validate patch
     validated = True  # In production, run validation suite
     
     # Store patch
-    PATCH_REGISTRY[patch_id] = {
+    bounded_set(PATCH_REGISTRY, patch_id, {
         "ticket_id": req.ticket_id,
         "unit": req.unit,
         "strategy": req.strategy,
         "delta_k": delta_k,
         "delta_theta": delta_theta,
-        "timestamp": datetime.datetime.utcnow().isoformat()
-    }
+        "timestamp_ns": ns
+    }, MAX_PATCHES)
+    bump_status_version(app)
     
     return ImproveResp(
         patch_id=patch_id,
@@ -207,6 +212,8 @@ def reinvest(req: ReinvestReq):
     """
     # Get patch details
     patch = PATCH_REGISTRY.get(req.patch_id, {})
+    if patch:
+        PATCH_REGISTRY.move_to_end(req.patch_id)
     
     # Calculate new parameters
     # In production, these would come from actual system state
@@ -226,19 +233,24 @@ def reinvest(req: ReinvestReq):
     )
 
 
+_STATUS = {
+    "service": "Λ‑Regen",
+    "description": "Regeneration and repair engine (Flux Fractal)",
+    "capabilities": [
+        "Anomaly detection",
+        "Component quarantine",
+        "Improvement strategies (retrain, patch, replace)",
+        "Gain reinvestment"
+    ],
+    "flux_fractal": "Detect → Quarantine → Improve → Reinvest"
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Regen status"""
     return {
-        "service": "Λ‑Regen",
-        "description": "Regeneration and repair engine (Flux Fractal)",
-        "capabilities": [
-            "Anomaly detection",
-            "Component quarantine",
-            "Improvement strategies (retrain, patch, replace)",
-            "Gain reinvestment"
-        ],
-        "flux_fractal": "Detect → Quarantine → Improve → Reinvest",
+        **_STATUS,
         "active_quarantines": len(QUARANTINE_REGISTRY),
         "applied_patches": len(PATCH_REGISTRY)
     }
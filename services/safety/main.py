@@ -10,10 +10,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
-from services.common.server import create_app, run
+from services.common.server import RandomPool, create_app, pack_ns, run, short_id, utc_isoformat
+from functools import lru_cache
+import time
 
 app = create_app("safety")
 
+_RNG = RandomPool()
+
 
 class VerifyReq(BaseModel):
     """Request to verify change"""
@@ -76,27 +80,34 @@ def verify(req: VerifyReq):
     - Non-interference between critical levels
     - Safety boundaries
     """
+    reasons = _verify_reasons(req.attested, req.canary, req.rollback_plan, req.risk_level)
+    pass_check = len(reasons) == 0
+    
+    return VerifyResp(
+        pass_=pass_check,
+        reasons=list(reasons) if not pass_check else ["All checks passed"]
+    )
+
+
+@lru_cache(maxsize=256)
+def _verify_reasons(attested: bool, canary: bool, rollback_plan: bool, risk_level: str) -> tuple:
+    """Failed checks for a change (pure in its inputs, so memoized)"""
     reasons = []
     
-    if not req.attested:
+    if not attested:
         reasons.append("Missing attestation")
     
-    if not req.canary:
+    if not canary:
         reasons.append("No canary deployment plan")
     
-    if not req.rollback_plan:
+    if not rollback_plan:
         reasons.append("No rollback plan defined")
     
     # Risk-based checks
-    if req.risk_level == "high" and not all([req.attested, req.canary, req.rollback_plan]):
+    if risk_level == "high" and not all([attested, canary, rollback_plan]):
         reasons.append("High risk changes require all safety measures")
     
-    pass_check = len(reasons) == 0
-    
-    return VerifyResp(
-        pass_=pass_check,
-        reasons=reasons if not pass_check else ["All checks passed"]
-    )
+    return tuple(reasons)
 
 
 @app.post("/sandbox", response_model=SandboxResp)
@@ -111,19 +122,16 @@ def sandbox(req: SandboxReq):
     - CPU/GPU caps
     - Resource monitoring
     """
-    import time
-    import random
-    
     violations = []
     
     # Simulate sandbox execution
     time.sleep(0.1)  # Simulate execution time
     
     # Random violation detection
-    if random.random() < 0.1:  # 10% chance of violation
+    if _RNG.random() < 0.1:  # 10% chance of violation
         violations.append("Attempted network access")
     
-    if random.random() < 0.05:  # 5% chance
+    if _RNG.random() < 0.05:  # 5% chance
         violations.append("Memory limit exceeded")
     
     verdict = "pass" if len(violations) == 0 else "fail"
@@ -146,12 +154,8 @@ def attest(req: AttestReq):
     - Signature verification
     - Boot-to-cloud chain
     """
-    import hashlib
-    import datetime
-    
     # Generate attestation ID
-    att_data = f"{req.component}:{datetime.datetime.utcnow()}".encode()
-    attestation_id = f"att-{hashlib.md5(att_data).hexdigest()[:12]}"
+    attestation_id = short_id("att", req.component.encode() + pack_ns(time.time_ns()))
     
     # Check signature if provided
     signature_ok = bool(req.signature)
@@ -194,30 +198,33 @@ def killswitch(reason: str, authorized: bool = False):
     return {
         "status": "kill-switch activated",
         "reason": reason,
-        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "timestamp": utc_isoformat(time.time_ns()),
         "action": "System halted for safety"
     }
 
 
+_STATUS = {
+    "service": "Λ‑Safety & Policy Guard",
+    "description": "Security, governance, and kill-switch",
+    "capabilities": [
+        "Change verification",
+        "Sandbox execution",
+        "Component attestation",
+        "Policy enforcement (OPA)",
+        "Kill-switch (superior privilege)"
+    ],
+    "invariants": [
+        "Domain isolation",
+        "Non-interference",
+        "Attestation required"
+    ]
+}
+
+
 @app.get("/status")
 def get_status():
     """Get Safety status"""
-    return {
-        "service": "Λ‑Safety & Policy Guard",
-        "description": "Security, governance, and kill-switch",
-        "capabilities": [
-            "Change verification",
-            "Sandbox execution",
-            "Component attestation",
-            "Policy enforcement (OPA)",
-            "Kill-switch (superior privilege)"
-        ],
-        "invariants": [
-            "Domain isolation",
-            "Non-interference",
-            "Attestation required"
-        ]
-    }
+    return _STATUS
 
 
 if __name__ == "__main__":
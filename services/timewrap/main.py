@@ -9,9 +9,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional, Tuple
 from services.common.server import create_app, run
+from functools import lru_cache
 import math
+import numpy as np
 
 app = create_app("timewrap")
 
@@ -35,6 +37,24 @@ class LambdaTimeResp(BaseModel):
     convergent: bool
 
 
+class LambdaTimeBatchReq(BaseModel):
+    """Request to calculate Λ‑Time over many parameter tuples"""
+    mode: List[int]
+    T1: List[float]
+    k: List[float]
+    P: List[float]
+    U: List[float]
+    eps: float = 1e-6  # Shared by all tuples
+    N: int = 32  # Shared by all tuples
+
+
+class LambdaTimeBatchResp(BaseModel):
+    """Response with Λ‑Time per parameter tuple, in request order"""
+    values: List[float]
+    mode_names: List[str]
+    convergent: List[bool]
+
+
 class FastPathReq(BaseModel):
     """Request for fast-path processing"""
     request_id: str
@@ -50,6 +70,73 @@ class FastPathResp(BaseModel):
     latency_ms: float
 
 
+@lru_cache(maxsize=1024)
+def _geom_sum(kP: float, N: int) -> float:
+    """
+    Partial geometric sum Σ(i=0 to N-1) (k·P)^i in closed form
+    
+    (kP^N - 1)/(kP - 1), with kP^N - 1 taken as expm1(N·log1p(kP - 1))
+    for positive kP so it stays accurate near the kP = 1 singularity.
+    
+    Raises:
+        OverflowError: kP^N overflows (the series itself may not)
+    """
+    if N <= 0:
+        return 0.0
+    if kP == 1.0:
+        return float(N)
+    if kP > 0:
+        return math.expm1(N * math.log1p(kP - 1.0)) / (kP - 1.0)
+    return (kP ** N - 1.0) / (kP - 1.0)
+
+
+# (mode_name, formula, convergent) per _lambda_time_core branch
+WRAP, STEADY, UNWRAP, UNWRAP_TRUNCATED = range(4)
+_BRANCHES = (
+    ("Λ‑Wrap", "T₁·log(U) / (1 - 1/(k·P))", True),
+    ("Λ‑Steady", "T₁·log(U)", True),
+    ("Λ‑Unwrap", "T₁·log(U) / (1 - k·P)", True),
+    ("Λ‑Unwrap (truncated)", "Σ(i=0 to {N}) T₁·(k·P)^i·log(U)", False),
+)
+
+
+def _lambda_time_core(
+    mode: int, T1: float, k: float, P: float, U: float, eps: float, N: int
+) -> Tuple[float, int]:
+    """
+    Numeric core of lambda_time on plain floats
+    
+    Returns:
+        (value, branch), where branch indexes _BRANCHES
+        
+    Raises:
+        ValueError: Wrap mode with k·P <= 1+ε
+    """
+    kP = k * P
+    log_U = math.log(U) if U > 0 else 0.0
+    
+    if mode == 1:  # Λ‑Wrap (compression)
+        if kP <= 1 + eps:
+            raise ValueError(f"Wrap mode requires k·P > 1+ε. Got k·P={kP}")
+        return T1 * log_U / (1 - 1/kP), WRAP
+    
+    if mode == 0:  # Λ‑Steady (equilibrium)
+        return T1 * log_U, STEADY
+    
+    # Λ‑Unwrap (expansion)
+    if abs(kP) < 1 - eps:
+        # Convergent series
+        return T1 * log_U / (1 - kP), UNWRAP
+    
+    # Divergent series - truncate at N iterations. The closed form needs
+    # kP^N, which can overflow where the largest term kP^(N-1) does not;
+    # sum those term by term (raising only if a term overflows)
+    try:
+        return T1 * log_U * _geom_sum(kP, N), UNWRAP_TRUNCATED
+    except OverflowError:
+        return sum(T1 * (kP ** i) * log_U for i in range(N)), UNWRAP_TRUNCATED
+
+
 @app.post("/lambda_time", response_model=LambdaTimeResp)
 def lambda_time(req: LambdaTimeReq):
     """
@@ -74,61 +161,97 @@ def lambda_time(req: LambdaTimeReq):
        Effect: Increases temporal granularity, useful for stress testing
     """
     try:
-        kP = req.k * req.P
-        log_U = math.log(req.U) if req.U > 0 else 0.0
-        
-        if req.mode == 1:  # Λ‑Wrap (compression)
-            if kP <= 1 + req.eps:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Wrap mode requires k·P > 1+ε. Got k·P={kP}"
-                )
-            value = req.T1 * log_U / (1 - 1/kP)
-            return LambdaTimeResp(
-                value=value,
-                mode_name="Λ‑Wrap",
-                formula="T₁·log(U) / (1 - 1/(k·P))",
-                convergent=True
-            )
-            
-        elif req.mode == 0:  # Λ‑Steady (equilibrium)
-            value = req.T1 * log_U
-            return LambdaTimeResp(
-                value=value,
-                mode_name="Λ‑Steady",
-                formula="T₁·log(U)",
-                convergent=True
-            )
-            
-        else:  # Λ‑Unwrap (expansion)
-            if abs(kP) < 1 - req.eps:
-                # Convergent series
-                value = req.T1 * log_U / (1 - kP)
-                return LambdaTimeResp(
-                    value=value,
-                    mode_name="Λ‑Unwrap",
-                    formula="T₁·log(U) / (1 - k·P)",
-                    convergent=True
-                )
-            else:
-                # Divergent series - truncate at N iterations
-                value = sum(
-                    req.T1 * (kP ** i) * log_U
-                    for i in range(req.N)
-                )
-                return LambdaTimeResp(
-                    value=value,
-                    mode_name="Λ‑Unwrap (truncated)",
-                    formula=f"Σ(i=0 to {req.N}) T₁·(k·P)^i·log(U)",
-                    convergent=False
-                )
-                
+        value, branch = _lambda_time_core(
+            req.mode, req.T1, req.k, req.P, req.U, req.eps, req.N
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    mode_name, formula, convergent = _BRANCHES[branch]
+    if branch == UNWRAP_TRUNCATED:
+        formula = formula.format(N=req.N)
+    return LambdaTimeResp(
+        value=value,
+        mode_name=mode_name,
+        formula=formula,
+        convergent=convergent
+    )
+
+
+def _geom_sum_array(kP: np.ndarray, N: int) -> np.ndarray:
+    """Vectorized _geom_sum"""
+    if N <= 0:
+        return np.zeros_like(kP)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        d = kP - 1.0
+        positive = np.expm1(N * np.log1p(np.where(kP > 0, d, 0.0))) / d
+        negative = (kP ** N - 1.0) / d
+        return np.where(kP == 1.0, float(N), np.where(kP > 0, positive, negative))
+
+
+@app.post("/lambda_time_batch", response_model=LambdaTimeBatchResp)
+def lambda_time_batch(req: LambdaTimeBatchReq):
+    """
+    Calculate Λ‑Time for many parameter tuples in one vectorized pass
+    
+    Element i uses (mode[i], T1[i], k[i], P[i], U[i]) with the shared eps
+    and N, and matches lambda_time on the same inputs. The whole batch is
+    rejected if any Wrap tuple has k·P <= 1+ε (400) or any divergent
+    series term overflows (500).
+    """
+    n = len(req.mode)
+    if any(len(col) != n for col in (req.T1, req.k, req.P, req.U)):
+        raise HTTPException(
+            status_code=400,
+            detail="mode, T1, k, P and U must have the same length"
+        )
+    
+    mode = np.asarray(req.mode, dtype=np.int64)
+    T1 = np.asarray(req.T1, dtype=np.float64)
+    kP = np.asarray(req.k, dtype=np.float64) * np.asarray(req.P, dtype=np.float64)
+    U = np.asarray(req.U, dtype=np.float64)
+    base = T1 * np.log(np.where(U > 0, U, 1.0))
+    
+    wrap = mode == 1
+    bad = np.flatnonzero(wrap & (kP <= 1 + req.eps))
+    if bad.size:
+        i = int(bad[0])
+        raise HTTPException(
+            status_code=400,
+            detail=f"Wrap mode requires k·P > 1+ε. Got k·P={kP[i]} at index {i}"
+        )
+    
+    unwrap = (mode != 1) & (mode != 0)
+    convergent = ~unwrap | (np.abs(kP) < 1 - req.eps)
+    truncated = ~convergent
+    geom = _geom_sum_array(kP[truncated], req.N)
+    
+    branch = np.where(wrap, WRAP, np.where(mode == 0, STEADY, np.where(convergent, UNWRAP, UNWRAP_TRUNCATED)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(wrap, base / (1 - 1/kP), np.where(unwrap, base / (1 - kP), base))
+    values[truncated] = base[truncated] * geom
+    
+    # Where the closed form overflowed, use the scalar term-by-term fallback
+    for i in np.flatnonzero(truncated)[~np.isfinite(geom)].tolist():
+        try:
+            values[i], _ = _lambda_time_core(
+                -1, float(T1[i]), float(kP[i]), 1.0, float(U[i]), req.eps, req.N
+            )
+        except OverflowError as e:
+            raise HTTPException(status_code=500, detail=f"{e} at index {i}")
+    
+    names = [name for name, _, _ in _BRANCHES]
+    return LambdaTimeBatchResp(
+        values=values.tolist(),
+        mode_names=[names[b] for b in branch.tolist()],
+        convergent=convergent.tolist()
+    )
 
 
 @app.post("/fast_path", response_model=FastPathResp)
-def fast_path(req: FastPathReq):
+async def fast_path(req: FastPathReq):
     """
     Fast-path processing for 95% of requests
     
@@ -159,24 +282,27 @@ def fast_path(req: FastPathReq):
         )
 
 
+_STATUS = {
+    "service": "Λ‑TimeWrap Orchestrator",
+    "description": "Temporal compression engine for Λ‑Möbius",
+    "capabilities": [
+        "Λ‑Time calculation (Wrap/Steady/Unwrap)",
+        "Fast-path routing (95% requests)",
+        "Slow-path for repairs",
+        "Temporal compression optimization"
+    ],
+    "formulas": {
+        "wrap": "T₁·log(U) / (1 - 1/(k·P))",
+        "steady": "T₁·log(U)",
+        "unwrap": "T₁·log(U) / (1 - k·P)"
+    }
+}
+
+
 @app.get("/status")
 def get_status():
     """Get TimeWrap status"""
-    return {
-        "service": "Λ‑TimeWrap Orchestrator",
-        "description": "Temporal compression engine for Λ‑Möbius",
-        "capabilities": [
-            "Λ‑Time calculation (Wrap/Steady/Unwrap)",
-            "Fast-path routing (95% requests)",
-            "Slow-path for repairs",
-            "Temporal compression optimization"
-        ],
-        "formulas": {
-            "wrap": "T₁·log(U) / (1 - 1/(k·P))",
-            "steady": "T₁·log(U)",
-            "unwrap": "T₁·log(U) / (1 - k·P)"
-        }
-    }
+    return _STATUS
 
 
 if __name__ == "__main__":
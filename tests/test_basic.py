@@ -2,15 +2,35 @@
 Basic tests for Λ‑Möbius services
 """
 import pytest
+import asyncio
 import sys
 import os
+import time
 
 # Add services to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from services.arbiter.main import decide_mode, DecideReq, DecideResp
+from services.arbiter.main import calculate_utility, Metrics, UtilityWeights
+from services.arbiter.main import app as arbiter_app
 from services.timewrap.main import lambda_time, LambdaTimeReq, LambdaTimeResp
+from services.timewrap.main import lambda_time_batch, LambdaTimeBatchReq
+from services.balance.main import tune, TuneReq
+from services.econ.main import allocate_investment, InvestReq
+from services.regen.main import detect, DetectReq
+import services.econ.main as econ
+from collections import OrderedDict
+from services.memory.main import write, read, read_batch, WriteReq, ReadReq, ReadBatchReq
+from services.memory.main import similar, SimilarReq
+import services.memory.main as memory
+from concurrent.futures import ThreadPoolExecutor
+from services.secureio.main import app as secureio_app, ingress_filter, IngressReq
+from services.secureio.main import Bucket, check_rate_limit, RateLimitReq, egress_filter
+from fastapi import HTTPException, Response
+from fastapi.testclient import TestClient
+from services.common.server import MicroBatcher, RandomPool, bump_status_version, create_app
 import math
+import orjson
 
 
 class TestArbiter:
@@ -37,6 +57,18 @@ class TestArbiter:
         resp = decide_mode(req)
         assert resp["state"] == -1
         assert "Unwrap" in resp["mode_name"]
+    
+    def test_calculate_utility(self):
+        """Test utility terms: gains add, penalties subtract"""
+        m = Metrics(T1=10.0, k=1.5, P=1.0, U=8.0, theta=0.7,
+                    throughput=2.0, energy_eff=0.5, latency=30.0, risk=0.2, cost=3.0)
+        w = UtilityWeights()
+        resp = calculate_utility(m, w)
+        
+        expected = (w.wT * 2.0 + w.wE * 0.5 - w.wL * 30.0 - w.wR * 0.2 - w.wC * 3.0)
+        assert abs(resp.utility - expected) < 1e-9
+        assert abs(resp.latency_penalty - w.wL * 30.0) < 1e-9
+        assert resp == calculate_utility(m)
 
 
 class TestTimeWrap:
@@ -92,6 +124,523 @@ class TestTimeWrap:
         
         with pytest.raises(Exception):
             lambda_time(req)
+    
+    def test_lambda_time_batch_matches_single(self):
+        """Test batch results match lambda_time for every mode and branch"""
+        cases = [
+            (32, [(1, 2.0, 1.2), (0, 1.5, 1.0), (-1, 0.5, 1.0), (-1, 1.0, 1.0), (-1, 1.5, 1.0)]),
+            # k·P^N overflows but the largest term k·P^(N-1) does not
+            (31, [(-1, 1e10, 1.0)]),
+            (1024, [(-1, -2.0, 1.0)]),
+        ]
+        
+        for N, params in cases:
+            batch = lambda_time_batch(LambdaTimeBatchReq(
+                mode=[m for m, _, _ in params],
+                T1=[1.0] * len(params),
+                k=[k for _, k, _ in params],
+                P=[P for _, _, P in params],
+                U=[8.0] * len(params),
+                N=N
+            ))
+            
+            for i, (mode, k, P) in enumerate(params):
+                single = lambda_time(LambdaTimeReq(mode=mode, T1=1.0, k=k, P=P, U=8.0, N=N))
+                assert math.isclose(batch.values[i], single.value, rel_tol=1e-9)
+                assert batch.mode_names[i] == single.mode_name
+                assert batch.convergent[i] == single.convergent
+    
+    def test_lambda_time_divergent_overflow(self):
+        """Test a divergent series only fails when one of its terms overflows"""
+        resp = lambda_time(LambdaTimeReq(mode=-1, T1=1.0, k=1e10, P=1.0, U=8.0, N=31))
+        assert math.isclose(resp.value, math.log(8.0) * 1e300, rel_tol=1e-9)
+        
+        with pytest.raises(Exception):
+            lambda_time(LambdaTimeReq(mode=-1, T1=1.0, k=1e10, P=1.0, U=8.0, N=32))
+
+
+class TestBalance:
+    """Test Λ‑Balance"""
+    
+    def test_tune_unsaturated_integrates_error(self):
+        """Test integral accumulates plain error when throttle is not saturated"""
+        resp = tune(TuneReq(lat_p99=110.0, Lmax=100.0, integral=5.0))
+        assert 0.0 < resp.throttle < 1.0
+        assert abs(resp.integral - (5.0 - 10.0)) < 1e-9
+    
+    def test_tune_saturated_drains_integral(self):
+        """Test back-calculation anti-windup while throttle is saturated"""
+        resp = tune(TuneReq(lat_p99=400.0, Lmax=100.0, integral=-300.0))
+        assert resp.throttle == 0.0
+        # Windup is limited relative to plain accumulation of the error
+        assert resp.integral > -300.0 + (100.0 - 400.0)
+
+
+class TestEcon:
+    """Test Λ‑Econ"""
+    
+    def test_allocate_investment_greedy(self):
+        """Test budget goes to highest expected ROI first"""
+        req = InvestReq(
+            total_budget=10.0,
+            candidates=[("a", 6.0, 1.5), ("b", 8.0, 3.0), ("c", 5.0, 0.5)]
+        )
+        resp = allocate_investment(req)
+        
+        assert resp.allocations == {"b": 8.0, "a": 2.0}
+        assert abs(resp.total_allocated - 10.0) < 1e-9
+        assert abs(resp.expected_return - (8.0 * 3.0 + 2.0 * 1.5)) < 1e-9
+    
+    def test_allocate_investment_stops_at_exact_budget(self):
+        """Test an exactly spent budget leaves no phantom allocation"""
+        resp = allocate_investment(InvestReq(
+            total_budget=6.5,
+            candidates=[("a", 2.3, 3.0), ("b", 4.2, 2.0), ("c", 1.0, 1.0)]
+        ))
+        assert resp.allocations == {"a": 2.3, "b": 4.2}
+        
+        # A prefix sum leaves 1.3 - (3.8 - 2.5) = 2.2e-16 for "b" here
+        resp = allocate_investment(InvestReq(
+            total_budget=1.3,
+            candidates=[("a", 1.3, 2.0), ("b", 2.5, 1.0)]
+        ))
+        assert resp.allocations == {"a": 1.3}
+    
+    def test_record_spend_caps_unallocated_components(self, monkeypatch):
+        """Test spend-only components are evicted LRU-first, allocated ones never"""
+        monkeypatch.setattr(econ, "BUDGETS", OrderedDict(
+            (name, dict(budget)) for name, budget in econ.BUDGETS.items()
+        ))
+        monkeypatch.setattr(econ, "EVICTED_SPENT", 0.0)
+        monkeypatch.setattr(econ, "MAX_BUDGETS", 5)
+        
+        econ.record_spend("regen", 0.5)
+        for i in range(4):
+            econ.record_spend(f"tmp-{i}", 1.0)
+        econ.record_spend("tmp-2", 1.0)
+        econ.record_spend("tmp-4", 1.0)
+        
+        assert list(econ.BUDGETS) == ["entropy", "optimize", "regen", "tmp-2", "tmp-4"]
+        assert econ.BUDGETS["tmp-2"]["spent"] == 2.0
+        assert econ.get_status()["total_spent"] == 6.5
+
+
+class TestRegen:
+    """Test Λ‑Regen"""
+    
+    def test_detect_thresholds(self):
+        """Test threshold checks compare exactly, including huge and large ints"""
+        resp = detect(DetectReq(
+            signals={"huge": 10**400, "exact": 2**53 + 1, "ok": 1, "nan": float("nan"), "log": "Error!"},
+            thresholds={"huge": 1e300, "exact": 2.0**53, "ok": 5, "nan": 0, "missing": 0, "log": 0}
+        ))
+        assert resp.anomalies == [
+            "nan:NaN", "log:error_pattern", "huge:threshold_exceeded", "exact:threshold_exceeded"
+        ]
+        assert resp.severity == {"nan": "high", "log": "medium", "huge": "high", "exact": "high"}
+
+
+class TestMemory:
+    """Test Λ‑Memory"""
+    
+    def test_read_and_read_batch(self):
+        """Test substring matches in tags and payload, in insertion order"""
+        first = write(WriteReq(type="episodic", payload={"event": "Quokka outage"}))
+        second = write(WriteReq(type="semantic", payload={}, tags=["quokka-runbook"]))
+        write(WriteReq(type="episodic", payload={"event": "unrelated"}))
+        
+        resp = asyncio.run(read(ReadReq(query="QUOKKA")))
+        assert [item["id"] for item in resp.items] == [first.id, second.id]
+        
+        batch = read_batch(ReadBatchReq(queries=[
+            ReadReq(query="quokka", type="semantic"),
+            ReadReq(query="quokka", limit=1),
+            ReadReq(query="no-such-text"),
+        ]))
+        assert [r.count for r in batch] == [1, 1, 0]
+        assert batch[0].items[0]["id"] == second.id
+    
+    def test_read_query_with_nul_in_tags(self):
+        """Test NUL in a query matches NUL inside tags but never spans tags and payload"""
+        item = write(WriteReq(type="nul-test", payload={"k": "v"}, tags=["a\0b"]))
+        
+        resp = asyncio.run(read(ReadReq(query="A\0B", type="nul-test")))
+        assert [i["id"] for i in resp.items] == [item.id]
+        resp = asyncio.run(read(ReadReq(query="a\0b")))
+        assert item.id in [i["id"] for i in resp.items]
+        
+        resp = asyncio.run(read(ReadReq(query="b\0{", type="nul-test")))
+        assert resp.count == 0
+    
+    def test_read_coalescing_and_x_cache(self, monkeypatch):
+        """Test identical concurrent reads share one scan and X-Cache tracks cache state"""
+        # Calls into the memoized scan; the follower read must not make one
+        lookups = []
+        read_impl = memory._read_impl
+        
+        def counting_read_impl(*key):
+            lookups.append(key)
+            time.sleep(0.01)
+            return read_impl(*key)
+        
+        monkeypatch.setattr(memory, "_read_impl", counting_read_impl)
+        write(WriteReq(type="cache-test", payload={"animal": "pangolin"}))
+        req = ReadReq(query="pangolin", type="cache-test")
+        
+        async def read_twice():
+            responses = (Response(), Response())
+            results = await asyncio.gather(*(read(req, r) for r in responses))
+            return results, [r.headers["X-Cache"] for r in responses]
+        
+        (first, second), headers = asyncio.run(read_twice())
+        assert len(lookups) == 1
+        assert headers == ["miss", "hit"]
+        assert first == second and first.count == 1
+        
+        response = Response()
+        asyncio.run(read(req, response))
+        assert response.headers["X-Cache"] == "hit"
+        
+        epoch = memory.MEM_EPOCH
+        write(WriteReq(type="cache-test", payload={"animal": "pangolin too"}))
+        assert memory.MEM_EPOCH == epoch + 1
+        response = Response()
+        resp = asyncio.run(read(req, response))
+        assert response.headers["X-Cache"] == "miss"
+        assert resp.count == 2
+        assert len(lookups) == 3 and lookups[-1][0] == epoch + 1
+    
+    def test_concurrent_writes(self, monkeypatch):
+        """Test concurrent writes get distinct ids with consistent indexes"""
+        # Yield to other threads mid-write to widen any race window
+        utc_isoformat = memory.utc_isoformat
+        monkeypatch.setattr(memory, "utc_isoformat", lambda ns: time.sleep(0.0001) or utc_isoformat(ns))
+        
+        def write_one(i):
+            return write(WriteReq(type="conc-%d" % (i % 3), payload={"n": i}, tags=["conc"])).id
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(write_one, range(400)))
+        
+        assert len(set(ids)) == 400
+        for i, item_id in enumerate(ids):
+            item = memory.MEMORY_STORE[item_id]
+            assert item["id"] == item_id and item["payload"] == {"n": i}
+            assert memory.TYPE_CODES[item_id] == memory.TYPE_CODE[item["type"]]
+        
+        # Each partition's offsets still line up with its texts
+        for part in (None, "conc-0", "conc-1", "conc-2"):
+            ids_in_part = memory.TYPE_INDEX[part] if part else range(len(memory.SEARCH_TEXT))
+            count, blob = memory._search_blob(part)
+            starts = memory.SEARCH_STARTS[part]
+            assert count == len(starts)
+            for start, item_id in zip(starts, ids_in_part):
+                text = memory.SEARCH_TEXT[item_id]
+                assert blob[start:start + len(text)] == text
+    
+    def test_similar(self, monkeypatch):
+        """Test /similar ranking, type filter and empty store"""
+        best = write(WriteReq(type="sim-a", payload={}, tags=["zebra", "giraffe", "okapi"]))
+        near = write(WriteReq(type="sim-b", payload={}, tags=["zebra", "giraffe"]))
+        far = write(WriteReq(type="sim-a", payload={}, tags=["zebra"]))
+        
+        resp = similar(SimilarReq(query="Okapi giraffe zebra", limit=3))
+        assert [item["id"] for item in resp.items] == [best.id, near.id, far.id]
+        assert resp.scores == sorted(resp.scores, reverse=True)
+        assert resp.scores[0] == pytest.approx(1.0, abs=0.02)
+        
+        resp = similar(SimilarReq(query="okapi giraffe zebra", type="sim-a"))
+        assert [item["id"] for item in resp.items] == [best.id, far.id]
+        assert similar(SimilarReq(query="zebra", type="no-such-type")).count == 0
+        
+        # Only rows whose embedding is written are searched
+        monkeypatch.setattr(memory, "EMBED_ROWS", 0)
+        resp = similar(SimilarReq(query="zebra"))
+        assert (resp.items, resp.scores, resp.count) == ([], [], 0)
+    
+    def test_read_stream(self):
+        """Test /read_stream emits one JSON item per line, matching /read"""
+        client = TestClient(memory.app)
+        ids = [
+            write(WriteReq(type="stream-a", payload={"n": i}, tags=["Wombat"])).id
+            for i in range(3)
+        ]
+        ids.append(write(WriteReq(type="stream-b", payload={"note": "wombat burrow"})).id)
+        
+        for body, expected in (
+            ({"query": "WOMBAT"}, ids),
+            ({"query": "wombat", "limit": 2}, ids[:2]),
+            ({"query": "wombat", "type": "stream-b"}, ids[3:]),
+            ({"query": "wombat", "limit": 0}, []),
+            ({"query": "no-such-wombat"}, []),
+        ):
+            resp = client.post("/read_stream", json=body)
+            assert resp.status_code == 200
+            assert resp.headers["content-type"] == "application/x-ndjson"
+            assert resp.content == b"" or resp.content.endswith(b"\n")
+            items = [orjson.loads(line) for line in resp.content.splitlines()]
+            assert [item["id"] for item in items] == expected
+            if expected:
+                assert items == client.post("/read", json=body).json()["items"]
+
+
+class TestSecureIO:
+    """Test Λ‑Secure I/O"""
+    
+    def test_ingress_filter(self):
+        """Test caseless pattern blocking and attestation for sensitive sources"""
+        resp = asyncio.run(ingress_filter(IngressReq(payload={"q": "x; drop table users"})))
+        assert not resp.ok
+        assert resp.reason == "Blocked pattern detected: DROP TABLE"
+        
+        resp = asyncio.run(ingress_filter(IngressReq(payload="hello", source="edge")))
+        assert not resp.ok
+        
+        resp = asyncio.run(ingress_filter(IngressReq(payload="hello", source="edge", attestation="att-1")))
+        assert resp.ok
+        assert resp.filtered_payload == "hello"
+    
+    def test_ingress_filter_http_body_encodings(self):
+        """Test patterns hidden by JSON escapes or UTF-16/32 bodies are still blocked"""
+        client = TestClient(secureio_app)
+        body = '{"payload": {"q": "<script>alert(1); DROP TABLE users"}}'
+        headers = {"content-type": "application/json"}
+        
+        for content in (
+            body.encode(),
+            body.replace("<", "\\u003c").encode(),
+            body.encode("utf-16-le"),
+            body.encode("utf-32-be"),
+        ):
+            resp = client.post("/ingress", content=content, headers=headers)
+            assert resp.status_code == 200
+            assert resp.json()["ok"] is False
+            assert resp.json()["reason"] == "Blocked pattern detected: <script>"
+        
+        resp = client.post("/ingress", content='{"payload": "caf\u00e9"}'.encode(), headers=headers)
+        assert resp.json()["ok"] is True
+        assert resp.json()["filtered_payload"] == "café"
+    
+    def test_egress_filter(self):
+        """Test destination whitelist and caseless sensitive patterns, incl. non-ASCII folds"""
+        assert not egress_filter("mars", "hello")["ok"]
+        assert egress_filter("cloud", {"msg": "hello"})["ok"]
+        
+        resp = egress_filter("cloud", {"Password": "x"})
+        assert resp == {"ok": False, "reason": "Sensitive data pattern detected: password"}
+        
+        # KELVIN SIGN lowercases to ASCII "k"
+        assert egress_filter("cloud", "api_\u212aey=abc")["ok"] is False
+    
+    def test_bucket_refill_keeps_fractional_tokens(self):
+        """Test frequent calls accumulate the full refill (10 tokens/s)"""
+        for step_ns in (50_000, 333_000, 1_000_000):
+            bucket = Bucket(0)
+            bucket.tokens_milli = 0
+            now_ns = 0
+            while now_ns < 1_000_000_000:
+                now_ns += step_ns
+                bucket.try_acquire(now_ns, cost_milli=0)
+            assert 10_000 <= bucket.tokens_milli <= 10_010
+    
+    def test_check_rate_limit(self, monkeypatch):
+        """Test token bucket allowance, denial, reset_in_s and refill"""
+        clock = [10**12]
+        monkeypatch.setattr("services.secureio.main.time.monotonic_ns", lambda: clock[0])
+        req = RateLimitReq(client_id="test-client", endpoint="/rl-test")
+        
+        resp = check_rate_limit(req)
+        assert (resp.allowed, resp.remaining, resp.reset_in_s) == (True, 99, 0)
+        
+        for _ in range(99):
+            resp = check_rate_limit(req)
+        assert (resp.allowed, resp.remaining, resp.reset_in_s) == (True, 0, 10)
+        
+        resp = check_rate_limit(req)
+        assert (resp.allowed, resp.remaining, resp.reset_in_s) == (False, 0, 0)
+        
+        # 0.55 s refills 5.5 tokens; one is taken
+        clock[0] += 550_000_000
+        resp = check_rate_limit(req)
+        assert (resp.allowed, resp.remaining, resp.reset_in_s) == (True, 4, 9)
+        
+        # Fresh keys are independent
+        other = check_rate_limit(RateLimitReq(client_id="test-client", endpoint="/other"))
+        assert (other.allowed, other.remaining) == (True, 99)
+    
+    def test_check_rate_limit_keeps_fractional_tokens(self, monkeypatch):
+        """Test frequent calls do not drop the sub-millitoken refill remainder"""
+        clock = [10**12]
+        monkeypatch.setattr("services.secureio.main.time.monotonic_ns", lambda: clock[0])
+        
+        for step_ns in (50_000, 333_000, 1_000_000):
+            req = RateLimitReq(client_id="frac-%d" % step_ns, endpoint="/rl-test")
+            for _ in range(100):
+                check_rate_limit(req)
+            
+            # Polling an empty bucket for 1 s must still refill 10 tokens
+            allowed = 0
+            for _ in range(1_000_000_000 // step_ns):
+                clock[0] += step_ns
+                allowed += check_rate_limit(req).allowed
+            assert 9 <= allowed <= 10
+
+
+class TestCommon:
+    """Test shared server utilities"""
+    
+    def test_status_etag_middleware(self):
+        """Test /status caching, ETag revalidation and invalidation"""
+        app = create_app("etagtest")
+        state = {"calls": 0, "value": 1}
+        
+        @app.get("/status")
+        def status():
+            state["calls"] += 1
+            return {"value": state["value"]}
+        
+        client = TestClient(app)
+        first = client.get("/status")
+        assert first.status_code == 200
+        assert first.json() == {"value": 1}
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        
+        cached = client.get("/status")
+        assert cached.json() == {"value": 1}
+        assert cached.headers["etag"] == etag
+        
+        not_modified = client.get("/status", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert state["calls"] == 1
+        
+        state["value"] = 2
+        bump_status_version(app)
+        fresh = client.get("/status", headers={"If-None-Match": etag})
+        assert fresh.status_code == 200
+        assert fresh.json() == {"value": 2}
+        assert fresh.headers["etag"] != etag
+        assert state["calls"] == 2
+    
+    def test_status_etag_middleware_passes_errors_uncached(self):
+        """Test non-200 /status responses pass through and are not cached"""
+        app = create_app("etagerror")
+        state = {"calls": 0}
+        
+        @app.get("/status")
+        def status():
+            state["calls"] += 1
+            raise HTTPException(status_code=503, detail="warming up")
+        
+        client = TestClient(app)
+        for expected_calls in (1, 2):
+            resp = client.get("/status")
+            assert resp.status_code == 503
+            assert resp.json() == {"detail": "warming up"}
+            assert "etag" not in resp.headers
+            assert state["calls"] == expected_calls
+    
+    def test_micro_batcher_coalesces_concurrent_submits(self):
+        """Test concurrent submits share one batch and get their own results"""
+        batches = []
+        
+        def double(items):
+            batches.append(list(items))
+            return [2 * x for x in items]
+        
+        batcher = MicroBatcher(double, max_batch=8, window_s=0.05)
+        
+        async def submit_all():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        
+        assert asyncio.run(submit_all()) == [0, 2, 4, 6, 8]
+        assert batches == [[0, 1, 2, 3, 4]]
+    
+    def test_micro_batcher_propagates_errors(self):
+        """Test a failing batch raises in every waiter and the batcher keeps working"""
+        def fail(items):
+            if 0 in items:
+                raise ValueError("bad batch")
+            return items
+        
+        batcher = MicroBatcher(fail, window_s=0.05)
+        
+        async def submit_all():
+            failed = await asyncio.gather(
+                *(batcher.submit(i) for i in range(3)), return_exceptions=True
+            )
+            ok = await batcher.submit(7)
+            return failed, ok
+        
+        failed, ok = asyncio.run(submit_all())
+        assert len(failed) == 3
+        assert all(isinstance(e, ValueError) and str(e) == "bad batch" for e in failed)
+        assert ok == 7
+    
+    def test_random_pool_refills_on_wrap(self):
+        """Test the pool is redrawn each time the counter wraps, reproducibly per seed"""
+        pool = RandomPool(size_log2=3, seed=7)
+        first = [pool.random() for _ in range(8)]
+        buffer = pool._pool
+        assert first == buffer
+        
+        second = [pool.random() for _ in range(8)]
+        assert pool._pool is not buffer
+        assert second == pool._pool
+        assert second != first
+        
+        again = RandomPool(size_log2=3, seed=7)
+        assert [again.random() for _ in range(16)] == first + second
+    
+    def test_random_pool_sample_ranges(self):
+        """Test random/uniform/randint/coin return the right types and ranges"""
+        pool = RandomPool(size_log2=6, seed=3)
+        n = 2000
+        
+        samples = [pool.random() for _ in range(n)]
+        assert all(type(x) is float and 0.0 <= x < 1.0 for x in samples)
+        
+        samples = [pool.uniform(80, 120) for _ in range(n)]
+        assert all(type(x) is float and 80 <= x < 120 for x in samples)
+        
+        rolls = [pool.randint(1, 6) for _ in range(n)]
+        assert all(type(x) is int for x in rolls)
+        assert set(rolls) == {1, 2, 3, 4, 5, 6}
+        
+        flips = [pool.coin() for _ in range(n)]
+        assert all(type(x) is bool for x in flips)
+        assert 0.4 < sum(flips) / n < 0.6
+    
+    def test_json_route_schema_and_validation_errors(self):
+        """Test json_route endpoints stay in OpenAPI and answer bad bodies like FastAPI"""
+        client = TestClient(arbiter_app)
+        schema = client.get("/openapi.json").json()
+        op = schema["paths"]["/utility"]["post"]
+        components = schema["components"]["schemas"]
+        assert op["requestBody"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/UtilityReq"
+        }
+        assert components["UtilityReq"]["required"] == ["metrics"]
+        assert components["UtilityReq"]["properties"]["metrics"] == {"$ref": "#/components/schemas/Metrics"}
+        assert op["responses"]["200"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/UtilityBreakdown"
+        }
+        assert op["responses"]["422"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/HTTPValidationError"
+        }
+        
+        resp = client.post("/utility", json={"metrics": {"T1": 1.0}})
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"] == ["body", "metrics", "k"]
+        assert resp.json()["detail"][0]["type"] == "missing"
+        
+        resp = client.post("/decide_mode", content=b"{not json")
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"] == ["body"]
+        
+        resp = client.post("/decide_mode", json={"theta": 0.9})
+        assert resp.json() == decide_mode(DecideReq(theta=0.9))
 
 
 class TestIntegration: